@@ -1,10 +1,53 @@
 import streamlit as st
+from checkin import get_checkin_desk, find_by_dupr, CHECKED_IN, DUPLICATE, CLOSED
 
-st.title("👤 Player Join")
-st.markdown("## 🚧 Under Construction 🚧")
-st.info("Player join feature coming soon!")
 
-# ✅ Back button
-if st.button("⬅ Back to Home"):
-    st.session_state.page = "home"
-    st.rerun()
+def app():
+    """Player self check-in, reached through the organizer's join link."""
+
+    st.title("👤 Player Join")
+
+    code = st.query_params.get("join", "").strip().upper()
+
+    desk = get_checkin_desk()
+
+    if not code or not desk.is_open(code):
+        st.warning("This check-in link is not active. Ask the organizer for a new one.")
+        return
+
+    st.caption(f"Open play check-in · code **{code}**")
+
+    with st.form("checkin_form", clear_on_submit=True):
+
+        dupr = st.text_input("Your DUPR ID")
+
+        submitted = st.form_submit_button("✅ Check In")
+
+    if submitted:
+
+        if not dupr.strip():
+            st.error("Please enter your DUPR ID")
+            return
+
+        try:
+            player = find_by_dupr(dupr, desk.club(code))
+        except Exception as e:
+            st.error(f"Error looking up player: {e}")
+            return
+
+        if player is None:
+            st.error("DUPR ID not found. Ask the organizer to register you.")
+            return
+
+        status = desk.check_in(code, {
+            "name": player["name"],
+            "skill": player["skill"],
+            "dupr": player["dupr"]
+        })
+
+        if status == CHECKED_IN:
+            st.success(f"You're in, {player['name']}! Watch the queue for your court.")
+        elif status == DUPLICATE:
+            st.info(f"{player['name']}, you're already checked in.")
+        elif status == CLOSED:
+            st.warning("Check-in has closed for this session.")
@@ -1,10 +1,51 @@
 import streamlit as st
+from clubs import valid_slug, club_exists, username_taken, register_club
 
-st.title("🏢 Clubs")
-st.markdown("## 🚧 Under Construction 🚧")
-st.info("Club registration feature coming soon!")
 
-# ✅ Back button
-if st.button("⬅ Back to Home"):
-    st.session_state.page = "home"
-    st.rerun()
+def app():
+    """Register a new club together with its first organizer account."""
+
+    st.title("🏢 Register a Club")
+    st.write("Each club gets its own roster, leaderboard and AutoStack profiles.")
+
+    with st.form("register_club_form"):
+
+        name = st.text_input("Club Name")
+        slug = st.text_input("Club ID", help="Lowercase letters, digits and dashes, e.g. `sunset-picklers`")
+        contact = st.text_input("Contact Email")
+
+        st.markdown("**Organizer account**")
+        username = st.text_input("Username")
+        password = st.text_input("Password", type="password")
+        confirm = st.text_input("Confirm Password", type="password")
+
+        submitted = st.form_submit_button("✅ Register Club")
+
+    if submitted:
+
+        slug = slug.strip().lower()
+
+        if not name.strip() or not username.strip() or not password:
+            st.error("Please fill in the club name, username and password")
+        elif not valid_slug(slug):
+            st.error("Club ID must be 2-31 lowercase letters, digits or dashes")
+        elif password != confirm:
+            st.error("Passwords do not match")
+        elif len(password) < 8:
+            st.error("Password must be at least 8 characters")
+        else:
+            try:
+                if club_exists(slug):
+                    st.error(f"Club ID `{slug}` is already taken")
+                elif username_taken(username.strip()):
+                    st.error(f"Username `{username.strip()}` is already taken")
+                else:
+                    register_club(slug, name.strip(), contact.strip(), username.strip(), password)
+                    st.success(f"🎉 {name} registered! Sign in as **{username.strip()}**.")
+            except Exception as e:
+                st.error(f"Error registering club: {e}")
+
+    # ✅ Back button
+    if st.button("⬅ Back to Home"):
+        st.session_state.page = "home"
+        st.rerun()
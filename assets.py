@@ -0,0 +1,117 @@
+"""Pre-sized static assets and shared page CSS.
+
+At startup ``build_assets`` renders resized, compressed variants of
+``TDphoto.jpg`` into ``static/`` once per process.  Streamlit serves that
+folder at ``app/static/`` (``enableStaticServing`` in
+``.streamlit/config.toml``).  That route sends no ``Cache-Control``
+header, so how long browsers keep the files is up to their own heuristics;
+the content hash in each file name only guarantees that a new photo gets a
+new URL and is never served stale.
+
+Pages then reference the images by URL instead of pushing the full photo
+through ``st.image`` on every rerun.  The CSS strings are built once.
+Streamlit drops any element a rerun does not emit, so the ``<style>`` tag
+is still sent each rerun; it is the same small, unchanged element, and the
+frontend does not redraw it.
+"""
+import hashlib
+import os
+
+import streamlit as st
+
+
+# Streamlit serves static/ from next to the main script, which lives here
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+SOURCE = os.path.join(ROOT, "TDphoto.jpg")
+STATIC_DIR = os.path.join(ROOT, "static")
+STATIC_URL = "app/static"
+
+# name -> (max width px, JPEG quality)
+VARIANTS = {
+    "logo": (600, 82),          # shown at 300px, 2x for high-DPI screens
+    "background": (1600, 70),
+}
+
+BASE_CSS = """
+<style>
+[data-testid="stAppViewContainer"] {
+background-image: url("%(background)s");
+background-size: cover;
+background-position: center;
+background-repeat: no-repeat;
+background-attachment: fixed;
+}
+
+[data-testid="stSidebarNav"] {
+display: none;
+}
+</style>
+"""
+
+AUTOSTACK_CSS = """
+<style>
+footer {visibility:hidden;}
+a[href*="github.com/streamlit"]{display:none!important;}
+
+.court-card{
+    padding:14px;
+    border-radius:12px;
+    background:#f4f6fa;
+    margin-bottom:12px;
+}
+.waiting-box{
+    background:#fff3cd;
+    padding:10px;
+    border-radius:10px;
+}
+</style>
+"""
+
+
+@st.cache_resource(show_spinner=False)
+def build_assets():
+    """Render every variant once; ``{name: url}``, empty if Pillow is missing."""
+    try:
+        from PIL import Image
+    except ImportError:
+        return {}
+
+    with open(SOURCE, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()[:10]
+
+    os.makedirs(STATIC_DIR, exist_ok=True)
+    urls = {}
+
+    with Image.open(SOURCE) as source:
+        source = source.convert("RGB")
+
+        for name, (width, quality) in VARIANTS.items():
+            filename = f"tdphoto-{name}-{width}-{digest}.jpg"
+            path = os.path.join(STATIC_DIR, filename)
+
+            if not os.path.exists(path):
+                image = source.copy()
+                image.thumbnail((width, width * 10))
+                image.save(path, "JPEG", quality=quality, optimize=True, progressive=True)
+
+            urls[name] = f"{STATIC_URL}/{filename}"
+
+    return urls
+
+
+@st.cache_data(show_spinner=False)
+def page_css():
+    return BASE_CSS % {"background": build_assets().get("background", "")}
+
+
+def inject_css():
+    st.markdown(page_css(), unsafe_allow_html=True)
+
+
+def logo(width=300):
+    url = build_assets().get("logo")
+    if url:
+        st.markdown(f'<img src="{url}" width="{width}" alt="TiraDinks">', unsafe_allow_html=True)
+    else:
+        st.image(SOURCE, width=width)
@@ -0,0 +1,133 @@
+"""Self check-in desks shared between player phones and the organizer.
+
+Each AutoStack session opens a desk with a short code.  Players reach
+``PlayerJoin`` through a link / QR carrying that code and check in with
+their DUPR ID; arrivals are buffered here with an O(1) duplicate check.
+The organizer's page drains the buffer in batches, so dozens of arrivals
+cost one rerun instead of one each.  A desk belongs to the club that
+opened it, and only that club's players can check in there.  Desks the
+organizer page stops draining expire after ``DESK_TTL``.
+"""
+import secrets
+import string
+import threading
+import time
+from collections import deque
+
+import streamlit as st
+
+from players_feed import get_players_feed
+
+
+CODE_ALPHABET = string.ascii_uppercase + string.digits
+CODE_LENGTH = 6
+DESK_TTL = 30 * 60         # an open desk nobody drains for this long is closed
+
+CHECKED_IN, DUPLICATE, CLOSED = "checked_in", "duplicate", "closed"
+
+
+class _Desk:
+
+    __slots__ = ("pending", "seen", "club_id", "touched")
+
+    def __init__(self, club_id):
+        self.pending = deque()
+        self.seen = set()       # names already in the session
+        self.club_id = club_id
+        self.touched = time.monotonic()
+
+
+class CheckInDesk:
+
+    def __init__(self, ttl=DESK_TTL):
+        self._lock = threading.Lock()
+        self._desks = {}        # code -> _Desk
+        self.ttl = ttl
+
+    def _sweep(self):
+        """Close desks whose session went away without closing them."""
+        cutoff = time.monotonic() - self.ttl
+        for code in [c for c, d in self._desks.items() if d.touched < cutoff]:
+            del self._desks[code]
+
+    def open(self, club_id):
+        code = "".join(secrets.choice(CODE_ALPHABET) for _ in range(CODE_LENGTH))
+        with self._lock:
+            self._sweep()
+            self._desks[code] = _Desk(club_id)
+        return code
+
+    def close(self, code):
+        with self._lock:
+            self._desks.pop(code, None)
+
+    def is_open(self, code):
+        return code in self._desks
+
+    def club(self, code):
+        desk = self._desks.get(code)
+        return desk.club_id if desk else None
+
+    def mark_seen(self, code, names):
+        """Players already in the session (added by hand) count as checked in."""
+        with self._lock:
+            desk = self._desks.get(code)
+            if desk:
+                desk.seen.update(names)
+
+    def forget(self, code, name):
+        """``name`` left the session; they may check in again."""
+        with self._lock:
+            desk = self._desks.get(code)
+            if desk:
+                desk.seen.discard(name)
+
+    def check_in(self, code, player):
+        with self._lock:
+            self._sweep()
+            desk = self._desks.get(code)
+            if desk is None:
+                return CLOSED
+            if player["name"] in desk.seen:
+                return DUPLICATE
+            desk.seen.add(player["name"])
+            desk.pending.append(player)
+            return CHECKED_IN
+
+    def pending_count(self, code):
+        desk = self._desks.get(code)
+        return len(desk.pending) if desk else 0
+
+    def drain(self, code):
+        """Take the waiting arrivals; also keeps the desk alive."""
+        with self._lock:
+            desk = self._desks.get(code)
+            if not desk:
+                return []
+            desk.touched = time.monotonic()
+            batch = list(desk.pending)
+            desk.pending.clear()
+            return batch
+
+
+@st.cache_resource(show_spinner=False)
+def get_checkin_desk():
+    return CheckInDesk()
+
+
+def _dupr_index(rows):
+    index = {}
+    for r in rows:
+        # Players without a DUPR ID are not reachable by one
+        if r.get("dupr") is None:
+            continue
+        key = str(r["dupr"]).strip().upper()
+        if key:
+            index[key] = r
+    return index
+
+
+def find_by_dupr(dupr, club_id=None):
+    """Registered player with this DUPR ID, from the club feed's dupr index."""
+    index = get_players_feed(club_id).derived("by_dupr", _dupr_index)
+    return index.get(dupr.strip().upper())
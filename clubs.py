@@ -0,0 +1,151 @@
+"""Club tenancy: the active club, club registration and per-club caches.
+
+Every club's data is partitioned by ``club_id`` (the club's slug): rows in
+Supabase carry it and every query filters on it (see
+``sql/001_clubs.sql``), and local SQLite files get one file per club.
+
+Process-wide caches (roster feed, mirror, profile and leaderboard
+stores) live in ``ClubCaches``: each club owns its own set, so a large
+club only ever fills its own caches.  When more than ``MAX_CLUBS`` clubs
+are resident, the least recently used club's whole set is dropped - never
+a slice of a busy club's - so eviction follows activity, not table size.
+
+Clubs register themselves with their first organizer account; accounts
+live in ``club_members`` with salted PBKDF2 password hashes.
+"""
+import hashlib
+import hmac
+import os
+import re
+import secrets
+import threading
+from collections import OrderedDict
+
+import streamlit as st
+
+import data_access
+
+
+DEFAULT_CLUB = "tiradinks"
+MAX_CLUBS = 32
+HASH_ITERATIONS = 200_000
+
+_SLUG = re.compile(r"^[a-z0-9][a-z0-9-]{1,30}$")
+
+
+def current_club():
+    return st.session_state.get("club_id") or DEFAULT_CLUB
+
+
+def club_path(path, club_id):
+    """Per-club local file; the default club keeps the original name."""
+    if club_id == DEFAULT_CLUB:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}-{club_id}{ext}"
+
+
+def valid_slug(slug):
+    return bool(_SLUG.match(slug))
+
+
+# ======================================================
+# PER-CLUB CACHES
+# ======================================================
+class ClubCaches:
+
+    def __init__(self, max_clubs=MAX_CLUBS):
+        self._lock = threading.Lock()
+        self._clubs = OrderedDict()     # club_id -> (lock, {name: resource})
+        self.max_clubs = max_clubs
+
+    def get(self, club_id, name, factory):
+        with self._lock:
+            entry = self._clubs.get(club_id)
+            if entry is None:
+                entry = self._clubs[club_id] = (threading.RLock(), {})
+                while len(self._clubs) > self.max_clubs:
+                    evicted_id, (_, evicted) = self._clubs.popitem(last=False)
+                    for resource in evicted.values():
+                        if hasattr(resource, "close"):
+                            resource.close()
+                    data_access.drop_club(evicted_id)
+            self._clubs.move_to_end(club_id)
+
+        # Build under the club's own lock: a slow first load for one club
+        # never holds up another club's lookups.
+        lock, resources = entry
+        with lock:
+            if name not in resources:
+                resources[name] = factory()
+            return resources[name]
+
+    def resident(self):
+        with self._lock:
+            return list(self._clubs)
+
+
+@st.cache_resource(show_spinner=False)
+def club_caches():
+    return ClubCaches()
+
+
+# ======================================================
+# REGISTRATION
+# ======================================================
+def hash_password(password, salt=None):
+    salt = salt or secrets.token_hex(16)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt.encode("ascii"), HASH_ITERATIONS)
+    return f"{salt}${digest.hex()}"
+
+
+def check_password(password, stored):
+    salt, _, _ = stored.partition("$")
+    return hmac.compare_digest(hash_password(password, salt), stored)
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def club_name(club_id):
+    if club_id == DEFAULT_CLUB:
+        return "TiraDinks"
+    try:
+        rows = data_access.select("clubs", columns="name", id=club_id)
+    except Exception:
+        return club_id
+    return rows[0]["name"] if rows else club_id
+
+
+def club_exists(club_id):
+    return club_id == DEFAULT_CLUB or bool(data_access.select("clubs", columns="id", id=club_id))
+
+
+def username_taken(username):
+    return bool(data_access.select("club_members", columns="id", username=username))
+
+
+def register_club(slug, name, contact, username, password):
+    """Create the club and its first organizer account in one transaction.
+
+    ``register_club`` (sql/001_clubs.sql) inserts both rows or neither, so
+    a taken username never leaves an orphaned club behind.
+    """
+    data_access.write(
+        lambda c: c.rpc("register_club", {
+            "p_club_id": slug,
+            "p_name": name,
+            "p_contact": contact,
+            "p_username": username,
+            "p_password_hash": hash_password(password)
+        }),
+        club_id=slug
+    )
+    club_name.clear()
+
+
+def authenticate(username, password):
+    """``(role, club_id)`` for a registered club account, else None."""
+    rows = data_access.select("club_members", columns="role, club_id, password_hash", username=username)
+    for row in rows:
+        if check_password(password, row["password_hash"]):
+            return row["role"], row["club_id"]
+    return None
@@ -0,0 +1,168 @@
+"""Court throughput, utilization and queue-wait estimates for AutoStack.
+
+``CourtAnalytics`` is fed timestamped lifecycle events (player queued,
+match started, match finished) and updates its running totals in O(1)
+per event.  Reads - games per hour, per-court utilization and turnover,
+and an ETA for every waiting player - only combine those totals.
+"""
+import time
+from collections import deque
+
+
+WINDOW = 20                 # recent matches / waits kept for rolling averages
+HOUR = 3600
+DEFAULT_MATCH_SECONDS = 15 * 60
+
+
+class CourtStats:
+
+    __slots__ = ("busy_since", "idle_since", "busy", "idle", "matches")
+
+    def __init__(self, now):
+        self.busy_since = None
+        self.idle_since = now
+        self.busy = 0.0
+        self.idle = 0.0
+        self.matches = 0
+
+
+class CourtAnalytics:
+
+    def __init__(self, now=None):
+        now = time.time() if now is None else now
+        self.opened_at = now
+        self.courts = {}
+        self.queued_at = {}                     # pid -> time they joined the queue
+        self.durations = deque(maxlen=WINDOW)   # recent match lengths, seconds
+        self.waits = deque(maxlen=WINDOW)       # recent queue waits, seconds
+        self.finished = deque()                 # finish times within the last hour
+
+    def _court(self, cid, now):
+        if cid not in self.courts:
+            self.courts[cid] = CourtStats(now)
+        return self.courts[cid]
+
+    def open_courts(self, cids, now=None):
+        now = time.time() if now is None else now
+        for cid in cids:
+            self._court(cid, now)
+
+    # ======================================================
+    # EVENTS
+    # ======================================================
+    def on_queue(self, pid, now=None):
+        self.queued_at[pid] = time.time() if now is None else now
+
+    def on_dequeue(self, pid, now=None):
+        """Player left the queue; their wait counts if they went on court."""
+        now = time.time() if now is None else now
+        joined = self.queued_at.pop(pid, None)
+        if joined is not None:
+            self.waits.append(now - joined)
+
+    def forget(self, pid):
+        """Player left without playing (removed from the session)."""
+        self.queued_at.pop(pid, None)
+
+    def on_start(self, cid, pids, now=None):
+        now = time.time() if now is None else now
+        court = self._court(cid, now)
+        if court.idle_since is not None:
+            court.idle += now - court.idle_since
+            court.idle_since = None
+        court.busy_since = now
+        for pid in pids:
+            self.on_dequeue(pid, now)
+
+    def on_finish(self, cid, pids, now=None):
+        """Close the match on ``cid``; returns its start time (or None)."""
+        now = time.time() if now is None else now
+        court = self._court(cid, now)
+        started = court.busy_since
+        if started is not None:
+            self.durations.append(now - started)
+            court.busy += now - started
+        court.busy_since = None
+        court.idle_since = now
+        court.matches += 1
+        self.finished.append(now)
+        for pid in pids:
+            self.on_queue(pid, now)
+        return started
+
+    def on_abandon(self, cid, pids, now=None):
+        """Court emptied without a result (a player was removed)."""
+        now = time.time() if now is None else now
+        court = self._court(cid, now)
+        if court.busy_since is not None:
+            court.busy += now - court.busy_since
+        court.busy_since = None
+        court.idle_since = now
+        for pid in pids:
+            self.on_queue(pid, now)
+
+    # ======================================================
+    # READS
+    # ======================================================
+    def started_at(self, cid):
+        court = self.courts.get(cid)
+        return court.busy_since if court else None
+
+    def games_per_hour(self, now=None):
+        now = time.time() if now is None else now
+        while self.finished and now - self.finished[0] > HOUR:
+            self.finished.popleft()
+        elapsed = min(HOUR, now - self.opened_at)
+        return len(self.finished) * HOUR / elapsed if elapsed > 0 else 0.0
+
+    def avg_match_seconds(self):
+        if not self.durations:
+            return DEFAULT_MATCH_SECONDS
+        return sum(self.durations) / len(self.durations)
+
+    def avg_wait_seconds(self):
+        return sum(self.waits) / len(self.waits) if self.waits else 0.0
+
+    def court_rows(self, now=None):
+        now = time.time() if now is None else now
+        rows = []
+        for cid in sorted(self.courts):
+            c = self.courts[cid]
+            busy = c.busy + (now - c.busy_since if c.busy_since is not None else 0)
+            idle = c.idle + (now - c.idle_since if c.idle_since is not None else 0)
+            total = busy + idle
+            hours = total / HOUR
+            rows.append({
+                "Court": cid,
+                "Matches": c.matches,
+                "Utilization (%)": round(100 * busy / total, 1) if total else 0.0,
+                "Turnover / h": round(c.matches / hours, 1) if hours else 0.0,
+                "Idle now (min)": round((now - c.idle_since) / 60, 1) if c.idle_since is not None else 0.0,
+            })
+        return rows
+
+    def queue_etas(self, queue, free_courts, now=None):
+        """Estimated seconds until each queued pid gets a court.
+
+        Every four players ahead in the queue need one court to turn over.
+        Free courts turn over now; busy courts at their expected remaining
+        time, and then once per average match after that.  Skill mixing
+        rules are ignored, so this is a lower bound for blocked players.
+        """
+        now = time.time() if now is None else now
+        avg = self.avg_match_seconds()
+
+        remaining = sorted(
+            [0.0] * free_courts
+            + [max(0.0, avg - (now - c.busy_since)) for c in self.courts.values() if c.busy_since is not None]
+        )
+
+        if not remaining:
+            return {pid: None for pid in queue}
+
+        etas = {}
+        for position, pid in enumerate(queue):
+            turn = position // 4
+            lap, slot = divmod(turn, len(remaining))
+            etas[pid] = remaining[slot] + lap * avg
+        return etas
@@ -0,0 +1,127 @@
+"""Data-access layer between the pages and Supabase.
+
+Page reads of the roster are served by the players feed, which calls
+``select`` once per club to seed itself; writes, club lookups and the
+feed's refreshes come through here.
+
+* Single-flight: identical reads that are already in flight are joined
+  rather than repeated, so N sessions asking for the same rows at the same
+  moment cost one request.
+* Bounded concurrency: at most ``MAX_CONCURRENT`` requests leave the
+  process at once, and at most ``MAX_PER_CLUB`` of them for any one club,
+  so a busy club cannot take every slot from the others.
+* Retry with exponential backoff and jitter for reads and idempotent
+  writes.
+* Results are immutable (tuples of read-only mappings) and shared by all
+  callers, so nobody can mutate another session's copy.
+"""
+import random
+import threading
+import time
+from concurrent.futures import Future
+from types import MappingProxyType
+
+import streamlit as st
+from supabase import create_client
+
+from supabase_client import instrument
+
+
+MAX_CONCURRENT = 4
+MAX_PER_CLUB = 2
+RETRIES = 3
+BACKOFF = 0.2
+
+
+@st.cache_resource(show_spinner=False)
+def _shared_client():
+    return create_client(
+        st.secrets["SUPABASE_URL"],
+        st.secrets["SUPABASE_KEY"]
+    )
+
+
+def client():
+    """One Supabase client for the whole process."""
+    return instrument(_shared_client())
+
+
+_slots = threading.BoundedSemaphore(MAX_CONCURRENT)
+_club_slots = {}
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def _freeze(rows):
+    return tuple(MappingProxyType(dict(r)) for r in rows or ())
+
+
+def _slots_for(club_id):
+    with _inflight_lock:
+        if club_id not in _club_slots:
+            _club_slots[club_id] = threading.BoundedSemaphore(MAX_PER_CLUB)
+        return _club_slots[club_id]
+
+
+def drop_club(club_id):
+    """Forget an evicted club's slot limiter."""
+    with _inflight_lock:
+        _club_slots.pop(club_id, None)
+
+
+def _with_retry(fn, retries, club_id=None):
+    club = _slots_for(club_id)
+    for attempt in range(retries + 1):
+        try:
+            with club, _slots:
+                return fn()
+        except Exception:
+            if attempt == retries:
+                raise
+            time.sleep(BACKOFF * (2 ** attempt) * (0.5 + random.random()))
+
+
+def _single_flight(key, fn):
+    with _inflight_lock:
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = _inflight[key] = Future()
+
+    if not leader:
+        return future.result()
+
+    try:
+        future.set_result(fn())
+    except Exception as e:
+        future.set_exception(e)
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+
+    return future.result()
+
+
+def select(table, columns="*", order=None, **eq):
+    """``table.select(columns).eq(...).order(order)`` as shared frozen rows."""
+    key = (table, columns, order, tuple(sorted(eq.items())))
+
+    def run():
+        query = client().table(table).select(columns)
+        for col, value in sorted(eq.items()):
+            query = query.eq(col, value)
+        if order:
+            query = query.order(order)
+        return _freeze(query.execute().data)
+
+    return _single_flight(key, lambda: _with_retry(run, RETRIES, eq.get("club_id")))
+
+
+def write(build, retries=0, club_id=None):
+    """Run ``build(client()).execute()`` under the concurrency bound.
+
+    Pass ``retries`` only for idempotent writes (updates, upserts, deletes),
+    and the ``club_id`` the write belongs to so it counts against that
+    club's share of the slots.
+    """
+    return _with_retry(lambda: build(client()).execute(), retries, club_id)
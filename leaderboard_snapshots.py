@@ -0,0 +1,134 @@
+"""Materialized leaderboard snapshots with rank history.
+
+``materialize`` ranks every category in one vectorized pass.  The current
+board is memoized on the players feed, so a page view is a dictionary
+read.  At most once per ``SNAPSHOT_INTERVAL`` - and only when rankings
+changed - the board is persisted as a compressed columnar row, giving the
+history that rank movement is measured against.  Boards and their
+history are kept per club.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+import pandas as pd
+
+from clubs import club_caches, club_path, current_club
+from players_feed import get_players_feed
+
+
+SNAPSHOT_PATH = os.environ.get("TIRADINKS_LEADERBOARD", "leaderboard.db")
+SNAPSHOT_INTERVAL = 3600
+MAX_SNAPSHOTS = 500
+COLUMNS = ["id", "name", "skill", "wins", "games", "win_rate", "rank"]
+RANKING = ["id", "skill", "rank", "wins"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    taken_at REAL NOT NULL,
+    payload BLOB NOT NULL
+);
+"""
+
+
+def materialize(rows):
+    """Rank players by wins, then win rate, within each skill category."""
+    if not rows:
+        return pd.DataFrame(columns=COLUMNS)
+
+    df = pd.DataFrame(rows).reindex(columns=["id", "name", "skill", "wins", "games"])
+    df["skill"] = df["skill"].fillna("").str.upper()
+    df["wins"] = df["wins"].fillna(0).astype(int)
+    df["games"] = df["games"].fillna(0).astype(int)
+    df["win_rate"] = (df["wins"] / df["games"].where(df["games"] > 0) * 100).fillna(0).round(2)
+
+    df = df.sort_values(["skill", "wins", "win_rate"], ascending=[True, False, False])
+    df["rank"] = df.groupby("skill").cumcount() + 1
+
+    return df[COLUMNS].reset_index(drop=True)
+
+
+class SnapshotStore:
+
+    def __init__(self, path=SNAPSHOT_PATH):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.executescript(SCHEMA)
+        self._frames = {}       # id -> DataFrame, snapshots never change
+        self._history = None
+
+    def history(self):
+        """``[(id, taken_at), ...]`` newest first."""
+        with self._lock:
+            if self._history is None:
+                self._history = self._db.execute(
+                    "SELECT id, taken_at FROM snapshots ORDER BY id DESC"
+                ).fetchall()
+            return self._history
+
+    def load(self, snapshot_id):
+        with self._lock:
+            if snapshot_id not in self._frames:
+                row = self._db.execute(
+                    "SELECT payload FROM snapshots WHERE id = ?", (snapshot_id,)
+                ).fetchone()
+                frame = pd.DataFrame(json.loads(zlib.decompress(row[0])))
+                self._frames[snapshot_id] = frame.reindex(columns=COLUMNS)
+            return self._frames[snapshot_id]
+
+    def save(self, board):
+        payload = zlib.compress(json.dumps(board.to_dict("list")).encode("utf-8"))
+        with self._lock:
+            cur = self._db.execute(
+                "INSERT INTO snapshots (taken_at, payload) VALUES (?, ?)",
+                (time.time(), payload)
+            )
+            self._db.execute(
+                "DELETE FROM snapshots WHERE id <= ?", (cur.lastrowid - MAX_SNAPSHOTS,)
+            )
+            self._frames[cur.lastrowid] = board
+            self._history = None
+        return cur.lastrowid
+
+    def maybe_save(self, board, interval=SNAPSHOT_INTERVAL):
+        """Persist ``board`` if the last snapshot is old and rankings moved."""
+        if board.empty:
+            return None
+        history = self.history()
+        if history:
+            last_id, taken_at = history[0]
+            if time.time() - taken_at < interval:
+                return None
+            last = self.load(last_id)
+            if last[RANKING].equals(board[RANKING]):
+                return None
+        return self.save(board)
+
+
+def rank_movement(board, previous):
+    """Places gained since ``previous`` (positive is up); NaN for new entries.
+
+    Players are matched on their row ``id`` within the same skill, so two
+    players sharing a name are never confused.
+    """
+    if previous is None or previous.empty:
+        return pd.Series(float("nan"), index=board.index)
+    ranks = dict(zip(zip(previous["id"], previous["skill"]), previous["rank"]))
+    prior = [ranks.get(key, float("nan")) for key in zip(board["id"], board["skill"])]
+    return pd.Series(prior, index=board.index, dtype="float") - board["rank"]
+
+
+def get_snapshot_store(club_id=None):
+    club_id = club_id or current_club()
+    return club_caches().get(club_id, "snapshots", lambda: SnapshotStore(club_path(SNAPSHOT_PATH, club_id)))
+
+
+def current_board(club_id=None):
+    """Latest materialized board; also feeds the periodic history."""
+    board = get_players_feed(club_id).derived("leaderboard_board", materialize)
+    get_snapshot_store(club_id).maybe_save(board)
+    return board
@@ -0,0 +1,215 @@
+"""Concurrent-session load test.
+
+Drives the real pages through Streamlit's ``AppTest`` against an in-memory
+Supabase stand-in and reports rerun latency percentiles, memory per
+session and Supabase calls for each concurrency level.  AutoStack
+sessions start mid-event (a roster on started courts) and submit a score
+on every rerun, so the write path is measured along with the reads.
+
+Concurrency is simulated: ``AppTest.run`` swaps process-global state
+(the runtime instance, ``st.secrets``, config options) in and out, so two
+runs must never overlap.  N sessions are kept alive side by side - sharing
+the process-wide caches, feed and stores like real sessions do - and
+their reruns are interleaved round-robin on one thread.  Latency is
+therefore per-rerun cost with N sessions resident, not contention::
+
+    python -m loadtest                        # 1, 10 and 100 sessions
+    python -m loadtest --sessions 5 --reruns 3 --json
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from loadtest.fake_supabase import FakeSupabase
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "streamlit_app.py")
+DUPR_PAGE = os.path.join(ROOT, "pages", "DUPRmatch.py")
+TIMEOUT = 60
+
+# AutoStack sessions run a live event: this many courts, this many players
+COURTS = 4
+ROSTER = 24
+
+
+# ======================================================
+# ENVIRONMENT
+# ======================================================
+def prepare(players):
+    """Point local stores at a scratch dir and swap in the fake client."""
+    scratch = tempfile.mkdtemp(prefix="tiradinks-load-")
+    os.environ["TIRADINKS_MIRROR"] = os.path.join(scratch, "mirror.db")
+    os.environ["TIRADINKS_PROFILES"] = os.path.join(scratch, "profiles.db")
+    os.environ["TIRADINKS_LEADERBOARD"] = os.path.join(scratch, "leaderboard.db")
+
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+
+    fake = FakeSupabase()
+    fake.seed_players(players)
+
+    import data_access
+    import players_feed
+
+    data_access.client = lambda: fake
+    # Measure the pages as with realtime up: no subscription, no polling
+    players_feed.start_realtime = lambda feed, timeout=5: False
+    players_feed.start_polling = lambda feed, mirror, interval=None: None
+
+    return fake
+
+
+# ======================================================
+# SCENARIOS
+# ======================================================
+def _app():
+    from streamlit.testing.v1 import AppTest
+    return AppTest.from_file(APP, default_timeout=TIMEOUT)
+
+
+def _organizer(page, **state):
+    at = _app()
+    for key, value in state.items():
+        at.session_state[key] = value
+    at.session_state["logged_in"] = True
+    at.session_state["role"] = "organizer"
+    at.session_state["user"] = "tdorg1"
+    at.session_state["club_id"] = "tiradinks"
+    at.run()
+    nav = next(s for s in at.sidebar.selectbox if s.label == "Navigate")
+    nav.set_value(page).run()
+    return at
+
+
+def login():
+    at = _app()
+    at.run()
+    at.text_input[0].input("tdmem2")
+    at.text_input[1].input("123456")
+    at.button[0].click().run()
+    return at
+
+
+def autostack():
+    """An event in progress: a roster from the players table, courts started."""
+    from stack_state import StackState
+    import data_access
+
+    stack = StackState()
+    for row in data_access.client().tables["players"][:ROSTER]:
+        stack.add_player(row["name"], row["skill"].upper(), row["dupr"])
+    stack.start(COURTS)
+
+    return _organizer("AutoStack", stack=stack)
+
+
+def submit_score(at):
+    """Finish the first busy court; the page refills it on the rerun."""
+    submit = [b for b in at.button if b.key and b.key.startswith("submit_")]
+    if not submit:
+        return at.run()
+    cid = submit[0].key.split("_", 1)[1]
+    at.number_input(key=f"A_{cid}").set_value(11)
+    at.number_input(key=f"B_{cid}").set_value(7)
+    return submit[0].click().run()
+
+
+def player_profile():
+    return _organizer("Player Profile")
+
+
+def leaderboard():
+    return _organizer("Players Leader Board")
+
+
+def duprmatch():
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(DUPR_PAGE, default_timeout=TIMEOUT)
+    at.run()
+    return at
+
+
+SCENARIOS = [login, autostack, player_profile, leaderboard, duprmatch]
+
+# What a rerun of each scenario does; a plain rerun unless listed here
+RERUNS = {autostack: submit_score}
+
+
+# ======================================================
+# MEASUREMENT
+# ======================================================
+def percentile(values, p):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    i = min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))
+    return ordered[i]
+
+
+def run_level(fake, sessions, reruns):
+    fake.reset_calls()
+
+    # Memory: traced allocations while every session renders once.
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    scenarios = [SCENARIOS[i % len(SCENARIOS)] for i in range(sessions)]
+    apps = [scenario() for scenario in scenarios]
+    per_session = (tracemalloc.get_traced_memory()[0] - before) / sessions
+    tracemalloc.stop()
+
+    # Latency: one rerun of every session per round, interleaved.
+    latencies = []
+    for _ in range(reruns):
+        for scenario, at in zip(scenarios, apps):
+            rerun = RERUNS.get(scenario, lambda at: at.run())
+            start = time.perf_counter()
+            rerun(at)
+            latencies.append(time.perf_counter() - start)
+
+    errors = sum(len(at.exception) for at in apps)
+
+    return {
+        "sessions": sessions,
+        "reruns": len(latencies),
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "memory_per_session_kb": per_session / 1024,
+        "supabase_calls": sum(fake.calls.values()),
+        "calls_by_op": {f"{t}.{op}": n for (t, op), n in sorted(fake.calls.items())},
+        "errors": errors,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m loadtest", description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--reruns", type=int, default=5, help="reruns per session")
+    parser.add_argument("--players", type=int, default=200, help="players in the fake table")
+    parser.add_argument("--json", action="store_true", help="print JSON lines instead of a table")
+    args = parser.parse_args(argv)
+
+    fake = prepare(args.players)
+
+    if not args.json:
+        print(f"{'sessions':>8} {'reruns':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+              f"{'KB/session':>11} {'db calls':>9} {'errors':>7}")
+
+    for sessions in args.sessions:
+        result = run_level(fake, sessions, args.reruns)
+        if args.json:
+            print(json.dumps(result))
+        else:
+            print(f"{result['sessions']:>8} {result['reruns']:>7} {result['p50_ms']:>8.1f} "
+                  f"{result['p95_ms']:>8.1f} {result['p99_ms']:>8.1f} "
+                  f"{result['memory_per_session_kb']:>11.1f} {result['supabase_calls']:>9} "
+                  f"{result['errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""In-memory stand-in for the Supabase client.
+
+Implements the ``table().select/insert/update/upsert/delete/eq/in_/order``
+surface the pages use plus the ``increment_player`` RPC, and counts every
+executed request per (table, op).  The load test drives it from one
+thread; the mirror's sync thread may call it too, so access is locked.
+"""
+import itertools
+import random
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+
+class FakeQuery:
+
+    def __init__(self, db, table):
+        self._db = db
+        self._table = table
+        self._op = "select"
+        self._columns = None
+        self._values = None
+        self._on_conflict = None
+        self._filters = []
+        self._order = None
+
+    # ======================================================
+    # OPERATIONS
+    # ======================================================
+    def select(self, columns="*"):
+        self._op = "select"
+        self._columns = [c.strip() for c in columns.split(",")] if columns != "*" else None
+        return self
+
+    def insert(self, values):
+        self._op, self._values = "insert", values
+        return self
+
+    def update(self, values):
+        self._op, self._values = "update", values
+        return self
+
+    def upsert(self, values, on_conflict=None):
+        self._op, self._values, self._on_conflict = "upsert", values, on_conflict
+        return self
+
+    def delete(self):
+        self._op = "delete"
+        return self
+
+    # ======================================================
+    # FILTERS
+    # ======================================================
+    def eq(self, column, value):
+        self._filters.append(lambda r: r.get(column) == value)
+        return self
+
+    def in_(self, column, values):
+        values = set(values)
+        self._filters.append(lambda r: r.get(column) in values)
+        return self
+
+    def order(self, column, desc=False):
+        self._order = (column, desc)
+        return self
+
+    # ======================================================
+    # EXECUTE
+    # ======================================================
+    def execute(self):
+        with self._db.lock:
+            self._db.calls[(self._table, self._op)] += 1
+            rows = self._db.tables.setdefault(self._table, [])
+            data = getattr(self, "_" + self._op)(rows)
+        return SimpleNamespace(data=data)
+
+    def _match(self, row):
+        return all(f(row) for f in self._filters)
+
+    def _select(self, rows):
+        found = [dict(r) for r in rows if self._match(r)]
+        if self._order:
+            column, desc = self._order
+            found.sort(key=lambda r: str(r.get(column) or ""), reverse=desc)
+        if self._columns:
+            found = [{c: r.get(c) for c in self._columns} for r in found]
+        return found
+
+    def _insert(self, rows):
+        values = self._values if isinstance(self._values, list) else [self._values]
+        added = [self._db.new_row(v) for v in values]
+        rows.extend(added)
+        return [dict(r) for r in added]
+
+    def _update(self, rows):
+        changed = []
+        for r in rows:
+            if self._match(r):
+                r.update(self._values)
+                changed.append(dict(r))
+        return changed
+
+    def _upsert(self, rows):
+        values = self._values if isinstance(self._values, list) else [self._values]
+        cols = (self._on_conflict or "id").split(",")
+        key = lambda r: tuple(r.get(c) for c in cols)
+        by_key = {key(r): r for r in rows}
+        result = []
+        for v in values:
+            if key(v) in by_key:
+                by_key[key(v)].update(v)
+                result.append(dict(by_key[key(v)]))
+            else:
+                row = self._db.new_row(v)
+                rows.append(row)
+                by_key[key(row)] = row
+                result.append(dict(row))
+        return result
+
+    def _delete(self, rows):
+        gone = [r for r in rows if self._match(r)]
+        rows[:] = [r for r in rows if not self._match(r)]
+        return [dict(r) for r in gone]
+
+
+class FakeSupabase:
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.tables = {}
+        self.calls = Counter()
+        self._ids = itertools.count(1)
+        self._clock = datetime(2024, 1, 1)
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    def rpc(self, name, params):
+        return SimpleNamespace(execute=lambda: self._rpc(name, params))
+
+    def _rpc(self, name, params):
+        if name != "increment_player":
+            raise NotImplementedError(name)
+        with self.lock:
+            self.calls[("rpc", name)] += 1
+            applied = self.tables.setdefault("applied_ops", [])
+            if params["p_op_id"] in applied:
+                return SimpleNamespace(data=None)
+            applied.append(params["p_op_id"])
+            for row in self.tables.get("players", []):
+                if row.get("club_id") == params["p_club_id"] and row["name"] == params["p_name"]:
+                    row["games"] = (row.get("games") or 0) + params["p_games"]
+                    row["wins"] = (row.get("wins") or 0) + params["p_wins"]
+        return SimpleNamespace(data=None)
+
+    def new_row(self, values):
+        self._clock += timedelta(seconds=1)
+        row = {"id": next(self._ids), "created_at": self._clock.isoformat(),
+               "games": 0, "wins": 0}
+        row.update(values)
+        return row
+
+    def seed_players(self, count, seed=0, club_id="tiradinks"):
+        rng = random.Random(seed)
+        skills = ["Beginner", "Novice", "Intermediate"]
+        with self.lock:
+            players = self.tables.setdefault("players", [])
+            for i in range(count):
+                games = rng.randint(0, 60)
+                players.append(self.new_row({
+                    "name": f"Player {i:04d}",
+                    "dupr": f"D{100000 + i}",
+                    "skill": rng.choice(skills),
+                    "games": games,
+                    "wins": rng.randint(0, games),
+                    "club_id": club_id,
+                }))
+
+    def reset_calls(self):
+        with self.lock:
+            self.calls.clear()
@@ -0,0 +1,227 @@
+"""Offline-first SQLite mirror of the ``players`` table.
+
+The mirror keeps the last known roster and every match result on local
+disk, plus an outbox of pending Supabase writes.  A background thread
+drains the outbox whenever the network is reachable, so a night of open
+play can run with the connection down and catch up afterwards.
+
+Match results are queued as increments (``games += 1``, ``wins += 1``),
+not as totals, one outbox row each.  Sync applies them through the
+``increment_player`` function (sql/002_player_increments.sql), which adds
+on the server in one statement and skips an ``op_id`` it has already
+seen, so two offline organizers add up instead of overwriting each other
+and a retried push is never counted twice.  Plain updates are
+last-writer-wins, and pending ones for the same row are coalesced to the
+newest values.
+
+Each club has its own mirror file and sync thread; synced writes are
+scoped to that club's rows.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+import data_access
+from clubs import DEFAULT_CLUB, club_caches, club_path, current_club
+
+
+MIRROR_PATH = os.environ.get("TIRADINKS_MIRROR", "mirror.db")
+SYNC_INTERVAL = 5
+MAX_BACKOFF = 120
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    id PRIMARY KEY,
+    name TEXT NOT NULL,
+    row TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS players_name ON players (name);
+
+CREATE TABLE IF NOT EXISTS matches (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    played_at REAL NOT NULL,
+    payload TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS outbox (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    tbl TEXT NOT NULL,
+    op TEXT NOT NULL,
+    key TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS outbox_key ON outbox (tbl, op, key);
+"""
+
+
+class LocalMirror:
+
+    def __init__(self, path=MIRROR_PATH, club_id=DEFAULT_CLUB):
+        self.club_id = club_id
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+        self.last_sync = None
+        self.last_error = None
+
+    # ======================================================
+    # PLAYERS
+    # ======================================================
+    def players(self):
+        with self._lock:
+            rows = self._db.execute("SELECT row FROM players").fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def replace_players(self, rows):
+        with self._lock, self._db:
+            self._db.execute("BEGIN")
+            self._db.execute("DELETE FROM players")
+            self._db.executemany(
+                "INSERT INTO players (id, name, row) VALUES (?, ?, ?)",
+                [(r["id"], r["name"], json.dumps(r, default=str)) for r in rows]
+            )
+
+    def apply_event(self, event, record):
+        """PlayersFeed listener: keep the on-disk roster in step."""
+        with self._lock:
+            if "id" in record:
+                found = self._db.execute("SELECT row FROM players WHERE id = ?", (record["id"],)).fetchone()
+            else:
+                found = self._db.execute("SELECT row FROM players WHERE name = ?", (record.get("name"),)).fetchone()
+
+            if event == "DELETE":
+                if found:
+                    self._db.execute("DELETE FROM players WHERE id = ?", (json.loads(found[0])["id"],))
+                return
+
+            row = {**(json.loads(found[0]) if found else {}), **record}
+            if "id" not in row:
+                return
+            self._db.execute(
+                "INSERT OR REPLACE INTO players (id, name, row) VALUES (?, ?, ?)",
+                (row["id"], row["name"], json.dumps(row, default=str))
+            )
+
+    # ======================================================
+    # MATCH RESULTS
+    # ======================================================
+    def record_match(self, entry):
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO matches (played_at, payload) VALUES (?, ?)",
+                (time.time(), json.dumps(entry, default=str))
+            )
+
+    def matches(self):
+        with self._lock:
+            rows = self._db.execute("SELECT payload FROM matches ORDER BY seq").fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    # ======================================================
+    # OUTBOX
+    # ======================================================
+    def enqueue_update(self, table, name, values):
+        """Queue ``update(values).eq("name", name)``; replaces a pending one."""
+        with self._lock, self._db:
+            self._db.execute("BEGIN")
+            self._db.execute(
+                "DELETE FROM outbox WHERE tbl = ? AND op = 'update' AND key = ?",
+                (table, name)
+            )
+            self._db.execute(
+                "INSERT INTO outbox (tbl, op, key, payload) VALUES (?, 'update', ?, ?)",
+                (table, name, json.dumps(values, default=str))
+            )
+
+    def enqueue_increment(self, name, games=0, wins=0):
+        """Queue ``games += games, wins += wins`` for player ``name``.
+
+        Every increment is its own outbox row with its own ``op_id``; rows
+        are never changed once written, so a sync in flight can only ever
+        delete what it pushed.
+        """
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO outbox (tbl, op, key, payload) VALUES ('players', 'increment', ?, ?)",
+                (name, json.dumps({"games": games, "wins": wins, "op_id": uuid.uuid4().hex}))
+            )
+
+    def pending(self):
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT seq, tbl, op, key, payload FROM outbox ORDER BY seq"
+            ).fetchall()
+        return [(seq, tbl, op, key, json.loads(payload)) for seq, tbl, op, key, payload in rows]
+
+    def pending_count(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    def sync_once(self, client):
+        """Push every pending write; stops at the first failure."""
+        pending = self.pending()
+        if not pending:
+            return 0
+
+        done = 0
+        for seq, tbl, op, key, values in pending:
+            try:
+                if op == "increment":
+                    # Atomic on the server, and a no-op for an op_id it has
+                    # already applied, so retries never count twice.
+                    client.rpc("increment_player", {
+                        "p_club_id": self.club_id,
+                        "p_name": key,
+                        "p_games": values["games"],
+                        "p_wins": values["wins"],
+                        "p_op_id": values["op_id"]
+                    }).execute()
+                else:
+                    client.table(tbl).update(values).eq("club_id", self.club_id).eq("name", key).execute()
+            except Exception:
+                with self._lock:
+                    self._db.execute("UPDATE outbox SET attempts = attempts + 1 WHERE seq = ?", (seq,))
+                raise
+            with self._lock:
+                self._db.execute("DELETE FROM outbox WHERE seq = ?", (seq,))
+            done += 1
+
+        return done
+
+    def start_sync(self, interval=SYNC_INTERVAL):
+        def loop():
+            delay = interval
+            while not self._stop.wait(delay):
+                try:
+                    if self.pending_count():
+                        self.sync_once(data_access.client())
+                    self.last_sync = time.time()
+                    self.last_error = None
+                    delay = interval
+                except Exception as e:
+                    self.last_error = str(e)
+                    delay = min(delay * 2, MAX_BACKOFF)
+
+        threading.Thread(target=loop, name=f"mirror-sync-{self.club_id}", daemon=True).start()
+
+    def close(self):
+        """Stop syncing; the outbox stays on disk for the next mirror."""
+        self._stop.set()
+
+
+def get_mirror(club_id=None):
+    """The club's mirror with its background sync thread running."""
+    club_id = club_id or current_club()
+
+    def build():
+        mirror = LocalMirror(club_path(MIRROR_PATH, club_id), club_id)
+        mirror.start_sync()
+        return mirror
+
+    return club_caches().get(club_id, "mirror", build)
@@ -0,0 +1,226 @@
+"""Bounded match history that spills to disk.
+
+The newest ``RING_SIZE`` matches stay in memory.  Whenever the ring
+fills, its oldest ``SPILL_BLOCK`` entries are appended to a per-session
+file as one column-oriented block (length prefix + zlib-compressed JSON of
+``{column: [values]}``).  The file is append-only; iteration and CSV
+export stream it block by block and then the in-memory tail, so memory
+stays flat however long the night runs.
+
+Saved profiles store history in the same block form (``dump`` /
+``from_bytes``), so saving streams the spill file as is.  Spill files are
+named after the owning process and removed when their ``MatchHistory`` is
+closed or garbage-collected (the session went away); files left by dead
+processes are swept on first use.
+"""
+import csv
+import io
+import json
+import os
+import struct
+import tempfile
+import uuid
+import weakref
+import zlib
+from collections import deque
+
+
+RING_SIZE = 200
+SPILL_BLOCK = 100
+SPILL_DIR = os.path.join(tempfile.gettempdir(), "tiradinks-history")
+
+HISTORY_MAGIC = b"TDH1"
+COPY_CHUNK = 64 * 1024
+
+_LENGTH = struct.Struct("<I")
+_swept = False
+
+
+def _encode_block(rows):
+    columns = []
+    for row in rows:
+        columns.extend(k for k in row if k not in columns)
+    data = {c: [row.get(c) for row in rows] for c in columns}
+    payload = zlib.compress(json.dumps({"rows": len(rows), "columns": data}).encode("utf-8"))
+    return _LENGTH.pack(len(payload)) + payload
+
+
+def _decode_block(payload):
+    return json.loads(zlib.decompress(payload))
+
+
+def _block_rows(block):
+    columns = block["columns"]
+    for i in range(block["rows"]):
+        yield {c: values[i] for c, values in columns.items()}
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def sweep_stale():
+    """Remove spill files whose process is gone."""
+    if not os.path.isdir(SPILL_DIR):
+        return
+    for f in os.listdir(SPILL_DIR):
+        owner = f.split("-", 1)[0]
+        if f.endswith(".tdh") and not (owner.isdigit() and _alive(int(owner))):
+            _remove(os.path.join(SPILL_DIR, f))
+
+
+class MatchHistory:
+
+    def __init__(self, entries=(), ring=RING_SIZE, block=SPILL_BLOCK):
+        self.recent = deque()
+        self.ring = ring
+        self.block = block
+        self.path = None
+        self.spilled = 0
+        self._columns = []      # every key seen, in first-seen order
+        for entry in entries:
+            self.append(entry)
+
+    def _see(self, keys):
+        self._columns.extend(k for k in keys if k not in self._columns)
+
+    def append(self, entry):
+        self._see(entry)
+        self.recent.append(entry)
+        if len(self.recent) > self.ring:
+            self._spill()
+
+    def _file(self):
+        global _swept
+        if self.path is None:
+            if not _swept:
+                sweep_stale()
+                _swept = True
+            os.makedirs(SPILL_DIR, exist_ok=True)
+            self.path = os.path.join(SPILL_DIR, f"{os.getpid()}-{uuid.uuid4().hex}.tdh")
+            self._cleanup = weakref.finalize(self, _remove, self.path)
+        return self.path
+
+    def _spill(self):
+        rows = [self.recent.popleft() for _ in range(min(self.block, len(self.recent)))]
+
+        with open(self._file(), "ab") as f:
+            f.write(_encode_block(rows))
+
+        self.spilled += len(rows)
+
+    def _blocks(self):
+        if self.path is None:
+            return
+        with open(self.path, "rb") as f:
+            while True:
+                head = f.read(_LENGTH.size)
+                if not head:
+                    return
+                (size,) = _LENGTH.unpack(head)
+                yield _decode_block(f.read(size))
+
+    def __len__(self):
+        return self.spilled + len(self.recent)
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __iter__(self):
+        for block in self._blocks():
+            yield from _block_rows(block)
+        yield from self.recent
+
+    def columns(self):
+        return list(self._columns)
+
+    def write_csv(self, f):
+        """Stream every match as CSV rows to the text file ``f``, in one pass."""
+        writer = csv.DictWriter(f, fieldnames=self.columns())
+        writer.writeheader()
+        for row in self:
+            writer.writerow(row)
+
+    def csv_file(self):
+        """The CSV export in a temporary file (binary, rewound).
+
+        Rows go straight from the spill blocks to disk; only one block is
+        decoded at a time.
+        """
+        f = tempfile.TemporaryFile()
+        text = io.TextIOWrapper(f, encoding="utf-8", newline="")
+        self.write_csv(text)
+        text.flush()
+        text.detach()
+        f.seek(0)
+        return f
+
+    # ======================================================
+    # STORED FORM
+    # ======================================================
+    def dump(self):
+        """``(size, chunks)``: the stored form, streamed from the spill file."""
+        tail = _encode_block(list(self.recent)) if self.recent else b""
+        spilled = os.path.getsize(self.path) if self.path else 0
+
+        def chunks():
+            yield HISTORY_MAGIC
+            if self.path:
+                with open(self.path, "rb") as f:
+                    while True:
+                        chunk = f.read(COPY_CHUNK)
+                        if not chunk:
+                            break
+                        yield chunk
+            yield tail
+
+        return len(HISTORY_MAGIC) + spilled + len(tail), chunks()
+
+    def to_bytes(self):
+        return b"".join(self.dump()[1])
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Inverse of ``dump``."""
+        view = memoryview(data)
+        if bytes(view[:len(HISTORY_MAGIC)]) != HISTORY_MAGIC:
+            raise ValueError("Not an AutoStack match history")
+
+        history = cls()
+        pos = len(HISTORY_MAGIC)
+        while pos < len(view):
+            (size,) = _LENGTH.unpack_from(view, pos)
+            end = pos + _LENGTH.size + size
+            block = _decode_block(view[pos + _LENGTH.size:end])
+            history._see(block["columns"])
+            if end < len(view) or block["rows"] > history.ring:
+                # Older blocks go back to disk as they are, undecoded rows and all
+                with open(history._file(), "ab") as f:
+                    f.write(view[pos:end])
+                history.spilled += block["rows"]
+            else:
+                history.recent.extend(_block_rows(block))
+            pos = end
+        return history
+
+    def close(self):
+        """Drop the spill file (the session is over or was replaced)."""
+        if self.path:
+            self._cleanup()
+        self.path = None
+        self.spilled = 0
+        self.recent.clear()
+        self._columns = []
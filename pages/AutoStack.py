@@ -1,45 +1,33 @@
 import streamlit as st
 import random
 from collections import deque
-import pandas as pd
-from itertools import combinations
-import json
+import time
 import os
-from supabase_client import get_supabase
+from players_feed import get_players_feed
+from local_mirror import get_mirror
+from profile_store import get_profile_store
+from stack_state import StackState
+from court_analytics import CourtAnalytics
+from checkin import get_checkin_desk
+from clubs import current_club
+from io import BytesIO
+import perf
+import assets
 
 
 def app():
 
-    supabase = get_supabase()
-
     # ======================================================
     # STYLE
     # ======================================================
-    st.markdown("""
-    <style>
-    footer {visibility:hidden;}
-    a[href*="github.com/streamlit"]{display:none!important;}
-
-    .court-card{
-        padding:14px;
-        border-radius:12px;
-        background:#f4f6fa;
-        margin-bottom:12px;
-    }
-    .waiting-box{
-        background:#fff3cd;
-        padding:10px;
-        border-radius:10px;
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    st.markdown(assets.AUTOSTACK_CSS, unsafe_allow_html=True)
 
     # =========================
     # HEADER PHOTO
     # =========================
     col1, col2, col3 = st.columns([1,2,1])
     with col2:
-        st.image("TDphoto.jpg", width=300)
+        assets.logo(width=300)
 
     st.title("🎾 Pickleball Auto Stack TiraDinks Official")
     st.caption("WE CAMED WE DINKED!")
@@ -47,119 +35,74 @@ def app():
     # ======================================================
     # HELPERS
     # ======================================================
-    def icon(skill):
-        return {"BEGINNER":"🟢","NOVICE":"🟡","INTERMEDIATE":"🔴"}[skill]
+    ICONS = ("🟢", "🟡", "🔴")     # indexed by skill code
+
+    MAX_COURTS = 64
+    COMPACT_FROM = 7                 # courts at which the grid goes compact
+    SWAP_MATCHES = 25                # queue players offered per swap search
 
     def superscript_number(n):
         sup_map = str.maketrans("0123456789", "⁰¹²³⁴⁵⁶⁷⁸⁹")
         return str(n).translate(sup_map)
 
     def fmt(p):
-        name, skill, dupr = p
-        games = st.session_state.players.get(name, {}).get("games", 0)
-        return f"{icon(skill)} {superscript_number(games)} {name}"
+        return f"{ICONS[p.skill]} {superscript_number(p.games)} {p.name}"
 
-    def safe_group(players):
-        skills = {p[1] for p in players}
-        return not ("BEGINNER" in skills and "INTERMEDIATE" in skills)
-
-    def make_teams(players):
-        random.shuffle(players)
-        return [players[:2], players[2:]]
+    def make_teams(pids):
+        random.shuffle(pids)
+        return pids
 
     # ======================================================
     # SESSION INIT
     # ======================================================
-    def init():
-        ss = st.session_state
-        ss.setdefault("queue", deque())
-        ss.setdefault("courts", {})
-        ss.setdefault("locked", {})
-        ss.setdefault("scores", {})
-        ss.setdefault("history", [])
-        ss.setdefault("started", False)
-        ss.setdefault("court_count", 2)
-        ss.setdefault("players", {})
-
-    init()
-
-    # ======================================================
-    # DELETE PLAYER
-    # ======================================================
-    def delete_player(name):
-
-        st.session_state.queue = deque(
-            [p for p in st.session_state.queue if p[0] != name]
-        )
+    st.session_state.setdefault("stack", StackState())
 
-        for cid, teams in st.session_state.courts.items():
+    stack = st.session_state.stack
 
-            if not teams:
-                continue
+    if stack.history_warning:
+        st.warning(stack.history_warning)
+        stack.history_warning = None
 
-            new_teams = []
+    compact = len(stack.court_ids()) >= COMPACT_FROM
 
-            for team in teams:
-                new_teams.append(
-                    [p for p in team if p[0] != name]
-                )
+    def new_analytics():
+        """Fresh timings for the current courts and queue."""
+        analytics = CourtAnalytics()
+        analytics.open_courts(stack.court_ids())
+        for pid in stack.queue:
+            analytics.on_queue(pid)
+        return analytics
 
-            if len(new_teams[0]) < 2 or len(new_teams[1]) < 2:
-                st.session_state.courts[cid] = None
-                st.session_state.locked[cid] = False
-            else:
-                st.session_state.courts[cid] = new_teams
+    if "analytics" not in st.session_state:
+        st.session_state.analytics = new_analytics()
 
-        st.session_state.players.pop(name, None)
+    analytics = st.session_state.analytics
 
     # ======================================================
     # MATCH ENGINE
     # ======================================================
-    def take_four_safe():
-
-        q = list(st.session_state.queue)
-
-        if len(q) < 4:
-            return None
-
-        for combo in combinations(range(len(q)), 4):
-
-            group = [q[i] for i in combo]
-
-            if safe_group(group):
-
-                for i in sorted(combo, reverse=True):
-                    del q[i]
-
-                st.session_state.queue = deque(q)
-
-                return group
-
-        return None
-
-
     def start_match(cid):
 
-        if st.session_state.locked.get(cid):
+        if stack.locked[cid - 1]:
             return
 
-        players = take_four_safe()
+        pids = stack.take_four_safe()
 
-        if not players:
+        if not pids:
             return
 
-        st.session_state.courts[cid] = make_teams(players)
-        st.session_state.locked[cid] = True
-        st.session_state.scores[cid] = [0,0]
+        stack.set_court(cid, make_teams(pids))
+        stack.locked[cid - 1] = 1
+        stack.set_score(cid, 0, 0)
 
+        analytics.on_start(cid, pids)
 
-    def finish_match(cid):
 
-        teams = st.session_state.courts[cid]
+    def finish_match(cid):
 
-        scoreA, scoreB = st.session_state.scores[cid]
+        teamA, teamB = stack.teams(cid)
 
-        teamA, teamB = teams
+        scoreA, scoreB = stack.score(cid)
 
         if scoreA > scoreB:
             winner = "Team A"
@@ -173,141 +116,158 @@ def app():
             winner = "DRAW"
             winners = losers = []
 
+        pids = stack.court_pids(cid)
+
+        finished = time.time()
+
+        started = analytics.started_at(cid)
+
+        result = {
+            "Court": cid,
+            "Team A": " & ".join(p.name for p in teamA),
+            "Team B": " & ".join(p.name for p in teamB),
+            "Score A": scoreA,
+            "Score B": scoreB,
+            "Winner": winner,
+            "Started": time.strftime("%H:%M:%S", time.localtime(started)) if started else "",
+            "Finished": time.strftime("%H:%M:%S", time.localtime(finished))
+        }
+
+        # Record the match first: if this raises, no stats or server
+        # increments have been applied yet and a retry is safe.
+        stack.history.append(result)
+
         for p in teamA + teamB:
-            st.session_state.players[p[0]]["games"] += 1
+            p.games += 1
 
         for p in winners:
-            st.session_state.players[p[0]]["wins"] += 1
+            p.wins += 1
 
         for p in losers:
-            st.session_state.players[p[0]]["losses"] += 1
+            p.losses += 1
 
-        # Supabase update
-        try:
+        # Queue the Supabase increments; the mirror syncs them in the
+        # background.  p.games / p.wins count this session only, so the
+        # roster gets +1 on top of the player's stored totals.
+        mirror = get_mirror()
 
-            for p in teamA + teamB:
+        for p in teamA + teamB:
 
-                name = p[0]
-                stats = st.session_state.players[name]
+            won = 1 if p in winners else 0
 
-                supabase.table("players").update({
-                    "games": stats["games"],
-                    "wins": stats["wins"]
-                }).eq("name", name).execute()
+            mirror.enqueue_increment(p.name, games=1, wins=won)
 
-        except:
-            pass
+            try:
+                feed = get_players_feed()
+                row = feed.get(p.name) or {}
+                feed.publisher.update({
+                    "name": p.name,
+                    "games": (row.get("games") or 0) + 1,
+                    "wins": (row.get("wins") or 0) + won
+                })
+            except:
+                pass
 
-        st.session_state.history.append({
-            "Court": cid,
-            "Team A": " & ".join(p[0] for p in teamA),
-            "Team B": " & ".join(p[0] for p in teamB),
-            "Score A": scoreA,
-            "Score B": scoreB,
-            "Winner": winner
-        })
+        analytics.on_finish(cid, pids, finished)
 
-        players = teamA + teamB
+        mirror.record_match(result)
 
-        random.shuffle(players)
+        random.shuffle(pids)
 
-        st.session_state.queue.extend(players)
+        stack.queue.extend(pids)
 
-        st.session_state.courts[cid] = None
-        st.session_state.locked[cid] = False
-        st.session_state.scores[cid] = [0,0]
+        stack.clear_court(cid)
 
 
     def auto_fill():
 
-        if not st.session_state.started:
+        if not stack.started:
             return
 
-        for cid in st.session_state.courts:
+        with perf.timer("matchmaking", page="AutoStack"):
 
-            if st.session_state.courts[cid] is None:
+            # Only free courts are visited; busy ones are never touched.
+            for cid in sorted(stack.free):
+
+                if len(stack.queue) < 4:
+                    break
 
                 start_match(cid)
 
     # ======================================================
     # PROFILE SAVE / LOAD
     # ======================================================
-    SAVE_DIR = "profiles"
-
-    os.makedirs(SAVE_DIR, exist_ok=True)
+    profiles = get_profile_store()
 
     def save_profile(name):
 
-        data = {
-
-            "queue": list(st.session_state.queue),
-            "courts": st.session_state.courts,
-            "locked": st.session_state.locked,
-            "scores": st.session_state.scores,
-            "history": st.session_state.history,
-            "started": st.session_state.started,
-            "court_count": st.session_state.court_count,
-            "players": st.session_state.players
-        }
-
-        with open(os.path.join(SAVE_DIR, f"{name}.json"), "w") as f:
-
-            json.dump(data, f)
+        profiles.save(name, stack)
 
         st.success("Profile saved!")
 
 
     def load_profile(name):
 
-        with open(os.path.join(SAVE_DIR, f"{name}.json"), "r") as f:
+        # Load first: if it fails, the current session is left untouched
+        loaded = profiles.load(name)
 
-            data = json.load(f)
+        stack.close()
 
-        st.session_state.queue = deque(data["queue"])
+        st.session_state.stack = loaded
 
-        st.session_state.courts = {int(k): v for k,v in data["courts"].items()}
+        st.session_state.pop("analytics", None)
 
-        st.session_state.locked = {int(k): v for k,v in data["locked"].items()}
 
-        st.session_state.scores = {int(k): v for k,v in data["scores"].items()}
+    def delete_profile(name):
 
-        st.session_state.history = data["history"]
+        profiles.delete(name)
 
-        st.session_state.started = data["started"]
+        st.success("Profile deleted!")
 
-        st.session_state.court_count = data["court_count"]
+        st.rerun()
 
-        st.session_state.players = data["players"]
+    # ======================================================
+    # SELF CHECK-IN
+    # ======================================================
+    desk = get_checkin_desk()
 
+    def join_link(code):
+        """Absolute join URL, or None when the app's public URL is unknown."""
 
-    def delete_profile(name):
+        base = os.environ.get("TIRADINKS_PUBLIC_URL") or getattr(st.context, "url", None) or ""
 
-        os.remove(os.path.join(SAVE_DIR, f"{name}.json"))
+        if not base.startswith(("http://", "https://")):
+            return None
 
-        st.success("Profile deleted!")
+        return f"{base.split('?')[0]}?join={code}"
 
-        st.rerun()
+    @st.cache_data(show_spinner=False)
+    def join_qr(link):
+        """PNG QR code for ``link``; None without the optional qrcode package."""
+        try:
+            import qrcode
+        except ImportError:
+            return None
+
+        out = BytesIO()
+        qrcode.make(link).save(out, format="PNG")
+        return out.getvalue()
 
     # ======================================================
-    # SIDEBAR
+    # FRAGMENTS
     # ======================================================
-    with st.sidebar:
+    # Each fragment reruns on its own when its widgets change; only
+    # actions that move players between queue and courts rerun the page.
+    @st.fragment
+    def roster_panel():
 
-        st.header("⚙ Setup")
-
-        st.session_state.court_count = st.selectbox(
-            "Courts",
-            [1,2,3,4,5,6],
-            index=st.session_state.court_count-1
-        )
-
-        # Load players from Supabase
+        # Registered players from the change-fed roster
         try:
-            registered = supabase.table("players").select("*").execute().data
+            feed = get_players_feed()
+            names = [p["name"] for p in feed.rows()]
         except:
-            registered = []
-
-        names = [p["name"] for p in registered]
+            feed = None
+            names = []
 
         with st.form("add_form", clear_on_submit=True):
 
@@ -315,242 +275,413 @@ def app():
 
             if st.form_submit_button("Add Player") and selected:
 
-                if selected not in st.session_state.players:
+                if selected not in stack.ids:
+
+                    data = feed.get(selected)
 
-                    data = next(p for p in registered if p["name"] == selected)
+                    player = stack.add_player(selected, data["skill"], data["dupr"])
 
-                    st.session_state.queue.appendleft(
-                        (selected, data["skill"].upper(), data["dupr"])
-                    )
+                    analytics.on_queue(player.pid)
 
-                    st.session_state.players[selected] = {
-                        "dupr": data["dupr"],
-                        "games":0,
-                        "wins":0,
-                        "losses":0
-                    }
+                    desk.mark_seen(st.session_state.get("checkin_code"), [selected])
 
-        if st.session_state.players:
+                    st.rerun()
+
+        if stack.ids:
 
             st.divider()
 
             remove = st.selectbox(
                 "❌ Remove Player",
-                list(st.session_state.players.keys())
+                list(stack.ids)
             )
 
             if st.button("Delete Player"):
 
-                delete_player(remove)
+                pid = stack.ids[remove]
+
+                for cid in stack.court_ids():
+                    pids = stack.court_pids(cid)
+                    if pid in pids:
+                        analytics.on_abandon(cid, [q for q in pids if q != pid])
+
+                analytics.forget(pid)
+
+                stack.remove_player(remove)
+
+                desk.forget(st.session_state.get("checkin_code"), remove)
 
                 st.rerun()
 
-        st.divider()
 
-        col1, col2 = st.columns(2)
+    @st.fragment(run_every=5)
+    def checkin_panel():
 
-        if col1.button("🚀 Start"):
+        code = st.session_state.get("checkin_code")
+
+        if not code or not desk.is_open(code):
 
-            st.session_state.started = True
+            if st.button("📲 Open Self Check-In"):
 
-            st.session_state.courts = {
-                i:None for i in range(1, st.session_state.court_count+1)
-            }
+                code = desk.open(current_club())
 
-            st.session_state.locked = {
-                i:False for i in st.session_state.courts
-            }
+                desk.mark_seen(code, stack.ids)
 
-            st.session_state.scores = {
-                i:[0,0] for i in st.session_state.courts
-            }
+                st.session_state.checkin_code = code
+
+                st.rerun(scope="fragment")
+
+            return
+
+        toast = st.session_state.pop("checkin_toast", None)
+
+        if toast:
+            st.toast(toast)
+
+        link = join_link(code)
+
+        st.markdown(f"**📲 Check-in code:** `{code}`")
+
+        if link:
+
+            st.code(link, language=None)
+
+            qr = join_qr(link)
+
+            if qr:
+                st.image(qr, width=180)
+
+        else:
+
+            st.caption("Set TIRADINKS_PUBLIC_URL to share a join link and QR code.")
+
+        # Arrivals since the last tick join the queue as one batch
+        added = 0
+
+        for p in desk.drain(code):
+
+            if p["name"] in stack.ids:
+                continue
+
+            player = stack.add_player(p["name"], p["skill"], p["dupr"])
+
+            analytics.on_queue(player.pid)
+
+            added += 1
+
+        if added:
+
+            # Shown after the rerun; a toast sent right before it is lost
+            st.session_state.checkin_toast = f"{added} player(s) checked in"
 
             st.rerun()
 
-        if col2.button("🔄 Reset"):
+        if st.button("Close Check-In"):
 
-            st.session_state.clear()
+            desk.close(code)
+
+            st.session_state.pop("checkin_code", None)
+
+            st.rerun(scope="fragment")
+
+
+    @st.fragment
+    def queue_box():
+
+        if stack.queue:
+
+            st.markdown(
+                f'<div class="waiting-box">{", ".join(fmt(stack.players[pid]) for pid in stack.queue)}</div>',
+                unsafe_allow_html=True
+            )
+
+        else:
+
+            st.success("No players waiting 🎉")
+
+
+    @st.fragment
+    def court_card(cid):
+
+        st.markdown('<div class="court-card">', unsafe_allow_html=True)
+
+        teams = stack.teams(cid)
+
+        if not teams:
+
+            st.markdown(f"**Court {cid}**  \n_Waiting for safe players..._")
+
+            st.markdown('</div>', unsafe_allow_html=True)
+
+            return
+
+        st.markdown(
+            f"**Court {cid}**  \n"
+            + " & ".join(fmt(p) for p in teams[0])
+            + "  \nvs  \n"
+            + " & ".join(fmt(p) for p in teams[1])
+        )
+
+        # Collapsed courts render nothing else; large venues open one at a time
+        if not st.toggle("Details", value=not compact, key=f"open_{cid}"):
+
+            st.markdown('</div>', unsafe_allow_html=True)
+
+            return
+
+        c1, c2 = st.columns(2)
+
+        if c1.button("🔀 Shuffle Teams", key=f"shuffle_{cid}"):
+
+            pids = stack.court_pids(cid)
+
+            random.shuffle(pids)
+
+            stack.set_court(cid, pids)
+
+            st.rerun(scope="fragment")
+
+        if c2.button("🔁 Rematch", key=f"rematch_{cid}"):
+
+            stack.set_score(cid, 0, 0)
+
+            st.rerun(scope="fragment")
+
+        st.divider()
+
+        a = st.number_input("Score A", 0, key=f"A_{cid}")
+
+        b = st.number_input("Score B", 0, key=f"B_{cid}")
+
+        if st.button("✅ Submit Score", key=f"submit_{cid}"):
+
+            stack.set_score(cid, a, b)
+
+            finish_match(cid)
 
             st.rerun()
 
+        st.markdown('</div>', unsafe_allow_html=True)
+
+        # ================================
+        # SWAP PLAYER
+        # ================================
+        # Pickers are built only when opened, and list only queue matches
         st.divider()
 
-        profile_name = st.text_input("Profile Name")
+        court = stack.court_pids(cid)
 
-        col1, col2 = st.columns(2)
+        if not stack.queue or not st.toggle("🔁 Swap Player", key=f"swap_open_{cid}"):
+            return
 
-        if col1.button("Save Profile") and profile_name:
+        out_pid = st.selectbox(
+            "Player OUT",
+            court,
+            format_func=lambda pid: stack.players[pid].name,
+            key=f"swap_out_{cid}"
+        )
 
-            save_profile(profile_name)
+        search = st.text_input("Search queue", key=f"swap_search_{cid}").strip().lower()
 
-        profiles = [
-            f[:-5] for f in os.listdir(SAVE_DIR)
-            if f.endswith(".json")
-        ]
+        matches = [
+            pid for pid in stack.queue
+            if search in stack.players[pid].name.lower()
+        ][:SWAP_MATCHES]
 
-        selected_profile = st.selectbox(
-            "Select Profile",
-            [""] + profiles
+        if not matches:
+
+            st.caption("No waiting player matches.")
+
+            return
+
+        in_pid = st.selectbox(
+            "Player IN",
+            matches,
+            format_func=lambda pid: stack.players[pid].name,
+            key=f"swap_in_{cid}"
         )
 
-        if col2.button("Load Profile") and selected_profile:
+        if st.button("🔄 Swap Player", key=f"swap_btn_{cid}"):
 
-            load_profile(selected_profile)
+            queue_list = list(stack.queue)
+
+            # Swap players
+            court[court.index(out_pid)] = in_pid
+            queue_list[queue_list.index(in_pid)] = out_pid
+
+            stack.set_court(cid, court)
+
+            stack.queue = deque(queue_list)
+
+            analytics.on_dequeue(in_pid)
+
+            analytics.on_queue(out_pid)
 
             st.rerun()
 
-        if st.button("Delete Profile") and selected_profile:
+    @st.fragment(run_every=30)
+    def throughput_dashboard():
 
-            delete_profile(selected_profile)
+        with st.expander("📈 Court Throughput"):
 
-        # ======================================================
-        # DOWNLOAD MATCHES CSV
-        # ======================================================
-        if st.session_state.history:
-            df_history = pd.DataFrame(st.session_state.history)
+            now = time.time()
 
-            st.download_button(
-                label="📥 Download Matches CSV",
-                data=df_history.to_csv(index=False).encode('utf-8'),
-                file_name="matches_history.csv",
-                mime="text/csv"
-            )
-        else:
-            st.info("No match history yet to download.")
+            m1, m2, m3 = st.columns(3)
+
+            m1.metric("Games / hour", f"{analytics.games_per_hour(now):.1f}")
+            m2.metric("Avg match", f"{analytics.avg_match_seconds() / 60:.0f} min")
+            m3.metric("Avg wait", f"{analytics.avg_wait_seconds() / 60:.0f} min")
+
+            st.dataframe(analytics.court_rows(now), use_container_width=True, hide_index=True)
+
+            if stack.queue:
+
+                etas = analytics.queue_etas(stack.queue, len(stack.free), now)
+
+                st.dataframe(
+                    [
+                        {
+                            "#": i + 1,
+                            "Player": stack.players[pid].name,
+                            "Waiting (min)": round((now - analytics.queued_at.get(pid, now)) / 60, 1),
+                            "ETA (min)": None if etas[pid] is None else round(etas[pid] / 60, 1)
+                        }
+                        for i, pid in enumerate(stack.queue)
+                    ],
+                    use_container_width=True,
+                    hide_index=True
+                )
 
     # ======================================================
-    # MAIN
+    # SIDEBAR
     # ======================================================
-    auto_fill()
-
-    st.subheader("⏳ Waiting Queue")
+    with st.sidebar:
 
-    if st.session_state.queue:
+        st.header("⚙ Setup")
 
-        st.markdown(
-            f'<div class="waiting-box">{", ".join(fmt(p) for p in st.session_state.queue)}</div>',
-            unsafe_allow_html=True
+        stack.court_count = st.number_input(
+            "Courts",
+            min_value=1,
+            max_value=MAX_COURTS,
+            value=stack.court_count
         )
 
-    else:
+        roster_panel()
 
-        st.success("No players waiting 🎉")
+        st.divider()
 
-    if not st.session_state.started:
+        checkin_panel()
 
-        st.stop()
+        st.divider()
 
-    st.divider()
+        col1, col2 = st.columns(2)
 
-    st.subheader("🏟 Live Courts")
+        if col1.button("🚀 Start"):
 
-    cols = st.columns(2)
+            stack.start(stack.court_count)
 
-    for i, cid in enumerate(st.session_state.courts):
+            st.session_state.analytics = new_analytics()
 
-        with cols[i % 2]:
+            st.rerun()
 
-            st.markdown('<div class="court-card">', unsafe_allow_html=True)
+        if col2.button("🔄 Reset"):
 
-            st.markdown(f"### Court {cid}")
+            stack.close()
 
-            teams = st.session_state.courts[cid]
+            desk.close(st.session_state.get("checkin_code"))
 
-            if not teams:
+            st.session_state.clear()
 
-                st.info("Waiting for safe players...")
+            st.rerun()
 
-                st.markdown('</div>', unsafe_allow_html=True)
+        st.divider()
 
-                continue
+        profile_name = st.text_input("Profile Name")
 
-            st.write("**Team A**  \n" + " & ".join(fmt(p) for p in teams[0]))
+        col1, col2 = st.columns(2)
 
-            st.write("**Team B**  \n" + " & ".join(fmt(p) for p in teams[1]))
+        if col1.button("Save Profile") and profile_name:
 
-            c1, c2 = st.columns(2)
+            save_profile(profile_name)
 
-            if c1.button("🔀 Shuffle Teams", key=f"shuffle_{cid}"):
+        profile_index = {p["name"]: p for p in profiles.index()}
 
-                players = teams[0] + teams[1]
+        def profile_label(name):
+            if not name:
+                return ""
+            p = profile_index[name]
+            updated = time.strftime("%b %d %H:%M", time.localtime(p["updated_at"]))
+            return f"{name} · {p['players']} players · {updated}"
 
-                random.shuffle(players)
+        selected_profile = st.selectbox(
+            "Select Profile",
+            [""] + list(profile_index),
+            format_func=profile_label
+        )
 
-                st.session_state.courts[cid] = [
-                    players[:2], players[2:]
-                ]
+        if col2.button("Load Profile") and selected_profile:
 
-                st.rerun()
+            load_profile(selected_profile)
 
-            if c2.button("🔁 Rematch", key=f"rematch_{cid}"):
+            st.rerun()
 
-                st.session_state.scores[cid] = [0,0]
+        if st.button("Delete Profile") and selected_profile:
 
-                st.rerun()
+            delete_profile(selected_profile)
 
-            st.divider()
+        # ======================================================
+        # DOWNLOAD MATCHES CSV
+        # ======================================================
+        if stack.has_history():
 
-            a = st.number_input("Score A", 0, key=f"A_{cid}")
+            # Built only when clicked, in one pass from the spill file
+            def export_csv():
 
-            b = st.number_input("Score B", 0, key=f"B_{cid}")
+                with perf.timer("export", page="AutoStack", format="csv") as t:
+                    history_csv = stack.history.csv_file()
+                    t.rows = len(stack.history)
 
-            if st.button("✅ Submit Score", key=f"submit_{cid}"):
+                return history_csv
 
-                st.session_state.scores[cid] = [a,b]
+            st.download_button(
+                label="📥 Download Matches CSV",
+                data=export_csv,
+                file_name="matches_history.csv",
+                mime="text/csv"
+            )
+        else:
+            st.info("No match history yet to download.")
 
-                finish_match(cid)
+        pending = get_mirror().pending_count()
 
-                st.rerun()
+        if pending:
+            st.caption(f"☁ {pending} player updates waiting to sync")
 
-            st.markdown('</div>', unsafe_allow_html=True)
+    # ======================================================
+    # MAIN
+    # ======================================================
+    auto_fill()
 
-            # ================================
-            # SWAP PLAYER
-            # ================================
-            st.divider()
-            st.markdown("**🔁 Swap Player**")
+    st.subheader("⏳ Waiting Queue")
 
-            flat_players = teams[0] + teams[1]
-            queue_list = list(st.session_state.queue)
+    queue_box()
 
-            if flat_players and queue_list:
+    if not stack.started:
 
-                out_player = st.selectbox(
-                    "Player OUT",
-                    [p[0] for p in flat_players],
-                    key=f"swap_out_{cid}"
-                )
+        st.stop()
 
-                in_player = st.selectbox(
-                    "Player IN",
-                    [p[0] for p in queue_list],
-                    key=f"swap_in_{cid}"
-                )
+    st.divider()
 
-                if st.button("🔄 Swap Player", key=f"swap_btn_{cid}"):
+    st.subheader("🏟 Live Courts")
 
-                    # Find indexes
-                    court_index = next(
-                        i for i,p in enumerate(flat_players) if p[0] == out_player
-                    )
+    cols = st.columns(4 if compact else 2)
 
-                    queue_index = next(
-                        i for i,p in enumerate(queue_list) if p[0] == in_player
-                    )
+    for i, cid in enumerate(stack.court_ids()):
 
-                    # Swap players
-                    flat_players[court_index], queue_list[queue_index] = (
-                        queue_list[queue_index],
-                        flat_players[court_index]
-                    )
+        with cols[i % len(cols)]:
 
-                    # Update teams
-                    st.session_state.courts[cid] = [
-                        flat_players[:2],
-                        flat_players[2:]
-                    ]
+            court_card(cid)
 
-                    # Update queue
-                    st.session_state.queue = deque(queue_list)
+    st.divider()
 
-                    st.rerun()
+    throughput_dashboard()
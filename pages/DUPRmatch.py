@@ -1,9 +1,11 @@
 import streamlit as st
 import pandas as pd
 import random
+import hashlib
 from collections import defaultdict
 from io import BytesIO
 import math
+import perf
 
 # ============================
 # PAGE CONFIG
@@ -12,6 +14,128 @@ st.set_page_config(page_title="DUPR Fair Match Generator", layout="wide")
 st.title("🏆 DUPR Fair Match Generator")
 st.write("Upload Excel file with columns: Name, DUPR_ID, Rating")
 
+REQUIRED_COLUMNS = ["Name", "DUPR_ID", "Rating"]
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+# ============================
+# HELPERS
+# ============================
+def roster_hash(df):
+    """Content hash of the roster columns, independent of file format."""
+    hashed = pd.util.hash_pandas_object(df[REQUIRED_COLUMNS], index=False)
+    return hashlib.sha256(hashed.values.tobytes()).hexdigest()
+
+
+def to_excel_bytes(df):
+    with perf.timer("export", page="DUPRmatch", format="xlsx") as t:
+        output = BytesIO()
+        df.to_excel(output, index=False, engine="openpyxl")
+        t.rows = len(df)
+    return output.getvalue()
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def build_schedule(roster_key, num_matches, num_courts, seed, _df):
+    """Split courts and generate matches.
+
+    Cached (LRU, bounded) on ``(roster_key, num_matches, num_courts, seed)``;
+    ``_df`` is not hashed, ``roster_key`` stands in for its content.
+    """
+    rng = random.Random(seed)
+
+    # Sort players by rating (HIGH to LOW)
+    df = _df.sort_values(by="Rating", ascending=False).reset_index(drop=True)
+
+    total_players = len(df)
+    players_per_court = math.ceil(total_players / num_courts)
+
+    matches_output = []
+    court_assignments_output = []
+
+    # ============================
+    # SPLIT PLAYERS EVENLY BY SKILL
+    # ============================
+    courts_players = []
+
+    for i in range(num_courts):
+        start = i * players_per_court
+        end = start + players_per_court
+        court_group = df.iloc[start:end].to_dict("records")
+        courts_players.append(court_group)
+
+    # ============================
+    # SAVE COURT ASSIGNMENTS
+    # ============================
+    for court_number, court_players in enumerate(courts_players, start=1):
+        for p in court_players:
+            court_assignments_output.append({
+                "Court": court_number,
+                "Player Name": p["Name"],
+                "DUPR_ID": p["DUPR_ID"],
+                "Rating": p["Rating"]
+            })
+
+    # ============================
+    # GENERATE MATCHES
+    # ============================
+    for court_number, court_players in enumerate(courts_players, start=1):
+
+        if len(court_players) < 4:
+            continue
+
+        partner_history = defaultdict(set)
+
+        # Avoid repeat partners
+        def repeated(team):
+            return team[1]["Name"] in partner_history[team[0]["Name"]]
+
+        for match_number in range(1, num_matches + 1):
+
+            rng.shuffle(court_players)
+
+            group = court_players[:4]
+
+            # Balanced pairing (strongest + weakest)
+            group_sorted = sorted(group, key=lambda x: x["Rating"])
+            team_a = [group_sorted[0], group_sorted[-1]]
+            team_b = [group_sorted[1], group_sorted[2]]
+
+            if repeated(team_a) or repeated(team_b):
+                rng.shuffle(group_sorted)
+                team_a = group_sorted[:2]
+                team_b = group_sorted[2:4]
+
+            # Update partner history
+            partner_history[team_a[0]["Name"]].add(team_a[1]["Name"])
+            partner_history[team_a[1]["Name"]].add(team_a[0]["Name"])
+            partner_history[team_b[0]["Name"]].add(team_b[1]["Name"])
+            partner_history[team_b[1]["Name"]].add(team_b[0]["Name"])
+
+            matches_output.append({
+                "Court": court_number,
+                "Match": match_number,
+                "Team A Player 1": team_a[0]["Name"],
+                "Team A Player 2": team_a[1]["Name"],
+                "Team A Avg Rating": round((team_a[0]["Rating"] + team_a[1]["Rating"]) / 2, 3),
+                "Team B Player 1": team_b[0]["Name"],
+                "Team B Player 2": team_b[1]["Name"],
+                "Team B Avg Rating": round((team_b[0]["Rating"] + team_b[1]["Rating"]) / 2, 3),
+            })
+
+    if not matches_output:
+        return None
+
+    matches_df = pd.DataFrame(matches_output)
+    court_df = pd.DataFrame(court_assignments_output)
+
+    return {
+        "matches": matches_df,
+        "matches_xlsx": to_excel_bytes(matches_df),
+        "courts_xlsx": to_excel_bytes(court_df),
+    }
+
+
 # ============================
 # FILE UPLOADER
 # ============================
@@ -22,6 +146,7 @@ uploaded_file = st.file_uploader("Upload Players Excel File", type=["xlsx", "csv
 # ============================
 NUM_MATCHES = st.number_input("Number of Matches", min_value=1, max_value=50, value=5)
 NUM_COURTS = st.number_input("Number of Courts", min_value=1, max_value=10, value=4)
+SEED = st.number_input("Seed", min_value=0, value=0, help="Same roster, settings and seed give the same schedule")
 
 # ============================
 # GENERATE MATCHES
@@ -35,125 +160,44 @@ if uploaded_file is not None:
         df = pd.read_excel(uploaded_file, engine="openpyxl")
 
     # Validate required columns
-    required_columns = ["Name", "DUPR_ID", "Rating"]
-    for col in required_columns:
+    for col in REQUIRED_COLUMNS:
         if col not in df.columns:
             st.error(f"Missing required column: {col}")
             st.stop()
 
+    schedule_key = (roster_hash(df), int(NUM_MATCHES), int(NUM_COURTS), int(SEED))
+
     if st.button("🚀 Generate Matches", use_container_width=True):
+        st.session_state.dupr_schedule_key = schedule_key
+
+    # ============================
+    # DISPLAY RESULTS
+    # ============================
+    # Served from the cache on every rerun until an input changes.
+    if st.session_state.get("dupr_schedule_key") == schedule_key:
+
+        with perf.timer("matchmaking", page="DUPRmatch"):
+            schedule = build_schedule(*schedule_key, df)
+
+        if schedule:
 
-        # Sort players by rating (HIGH to LOW)
-        df = df.sort_values(by="Rating", ascending=False).reset_index(drop=True)
-
-        total_players = len(df)
-        players_per_court = math.ceil(total_players / NUM_COURTS)
-
-        matches_output = []
-        court_assignments_output = []
-
-        # ============================
-        # SPLIT PLAYERS EVENLY BY SKILL
-        # ============================
-        courts_players = []
-
-        for i in range(NUM_COURTS):
-            start = i * players_per_court
-            end = start + players_per_court
-            court_group = df.iloc[start:end].to_dict("records")
-            courts_players.append(court_group)
-
-        # ============================
-        # SAVE COURT ASSIGNMENTS
-        # ============================
-        for court_number, court_players in enumerate(courts_players, start=1):
-            for p in court_players:
-                court_assignments_output.append({
-                    "Court": court_number,
-                    "Player Name": p["Name"],
-                    "DUPR_ID": p["DUPR_ID"],
-                    "Rating": p["Rating"]
-                })
-
-        # ============================
-        # GENERATE MATCHES
-        # ============================
-        for court_number, court_players in enumerate(courts_players, start=1):
-
-            if len(court_players) < 4:
-                continue
-
-            partner_history = defaultdict(set)
-
-            for match_number in range(1, NUM_MATCHES + 1):
-
-                random.shuffle(court_players)
-
-                group = court_players[:4]
-
-                # Balanced pairing (strongest + weakest)
-                group_sorted = sorted(group, key=lambda x: x["Rating"])
-                team_a = [group_sorted[0], group_sorted[-1]]
-                team_b = [group_sorted[1], group_sorted[2]]
-
-                # Avoid repeat partners
-                def repeated(team):
-                    return team[1]["Name"] in partner_history[team[0]["Name"]]
-
-                if repeated(team_a) or repeated(team_b):
-                    random.shuffle(group_sorted)
-                    team_a = group_sorted[:2]
-                    team_b = group_sorted[2:4]
-
-                # Update partner history
-                partner_history[team_a[0]["Name"]].add(team_a[1]["Name"])
-                partner_history[team_a[1]["Name"]].add(team_a[0]["Name"])
-                partner_history[team_b[0]["Name"]].add(team_b[1]["Name"])
-                partner_history[team_b[1]["Name"]].add(team_b[0]["Name"])
-
-                matches_output.append({
-                    "Court": court_number,
-                    "Match": match_number,
-                    "Team A Player 1": team_a[0]["Name"],
-                    "Team A Player 2": team_a[1]["Name"],
-                    "Team A Avg Rating": round((team_a[0]["Rating"] + team_a[1]["Rating"]) / 2, 3),
-                    "Team B Player 1": team_b[0]["Name"],
-                    "Team B Player 2": team_b[1]["Name"],
-                    "Team B Avg Rating": round((team_b[0]["Rating"] + team_b[1]["Rating"]) / 2, 3),
-                })
-
-        # ============================
-        # DISPLAY RESULTS
-        # ============================
-        if matches_output:
-
-            matches_df = pd.DataFrame(matches_output)
             st.success("✅ Matches Generated Successfully!")
-            st.dataframe(matches_df, use_container_width=True)
+            st.dataframe(schedule["matches"], use_container_width=True)
 
             # Download Matches Excel
-            output_matches = BytesIO()
-            matches_df.to_excel(output_matches, index=False, engine="openpyxl")
-            output_matches.seek(0)
-
             st.download_button(
                 label="📥 Download Match Schedule",
-                data=output_matches,
+                data=schedule["matches_xlsx"],
                 file_name="DUPR_Match_Schedule.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                mime=XLSX_MIME,
             )
 
             # Download Court Assignment Excel
-            court_df = pd.DataFrame(court_assignments_output)
-            output_courts = BytesIO()
-            court_df.to_excel(output_courts, index=False, engine="openpyxl")
-            output_courts.seek(0)
-
             st.download_button(
                 label="📥 Download Court Assignments",
-                data=output_courts,
+                data=schedule["courts_xlsx"],
                 file_name="DUPR_Court_Assignments.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                mime=XLSX_MIME,
             )
 
         else:
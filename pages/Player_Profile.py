@@ -1,23 +1,74 @@
 import streamlit as st
-from supabase_client import get_supabase
+import data_access
+from players_feed import get_players_feed
+from clubs import current_club
 import pandas as pd
 
+SKILLS = ["Beginner", "Novice", "Intermediate"]
+IMPORT_BATCH = 200
 
-def app():
 
-    # ==========================
-    # INIT
-    # ==========================
-    supabase = get_supabase()
+def read_roster_file(uploaded_file):
+    """Read the same Name/DUPR_ID sheets DUPRmatch accepts (Skill optional)."""
+    if uploaded_file.name.endswith(".csv"):
+        return pd.read_csv(uploaded_file, dtype=str)
+    return pd.read_excel(uploaded_file, engine="openpyxl", dtype=str)
+
+
+def prepare_import(df, existing_duprs):
+    """Validate and dedupe by DUPR ID in memory.
+
+    Returns ``(records, report)``: the rows to upsert and one report entry
+    per input row.  A blank or missing Skill leaves an existing player's
+    skill alone (no ``skill`` key); new players default to Beginner.
+    """
+    records = {}
+    report = []
+
+    for i, row in enumerate(df.to_dict("records"), start=2):     # row 1 is the header
+
+        name = str(row.get("Name") or "").strip()
+        dupr = str(row.get("DUPR_ID") or "").strip()
+        skill = str(row.get("Skill") or "").strip().title()
+
+        if name.lower() == "nan":
+            name = ""
+        if dupr.lower() == "nan":
+            dupr = ""
+        if skill == "Nan":
+            skill = ""
+
+        entry = {"Row": i, "Player": name, "DUPR ID": dupr}
+
+        if not name or not dupr:
+            entry["Status"] = "Skipped: missing Name or DUPR_ID"
+        elif skill and skill not in SKILLS:
+            entry["Status"] = f"Skipped: unknown skill {skill!r}"
+        elif dupr in records:
+            entry["Status"] = "Skipped: duplicate DUPR ID in file"
+        else:
+            records[dupr] = {"name": name, "dupr": dupr}
+            if skill or dupr not in existing_duprs:
+                records[dupr]["skill"] = skill or "Beginner"
+            entry["Status"] = "Updated" if dupr in existing_duprs else "Added"
+
+        report.append(entry)
+
+    return list(records.values()), report
+
+
+def app():
 
     st.title("🎾 Player Profiles - TiraDinks Official")
 
     # =====================================================
     # LOAD PLAYERS
     # =====================================================
+    club_id = current_club()
+
     try:
-        response = supabase.table("players").select("*").order("created_at").execute()
-        players = response.data or []
+        feed = get_players_feed(club_id)
+        players = feed.rows()
     except Exception as e:
         st.error(f"Error loading players: {e}")
         players = []
@@ -34,7 +85,7 @@ def app():
 
         skill = st.radio(
             "Skill",
-            ["Beginner", "Novice", "Intermediate"]
+            SKILLS
         )
 
         submitted = st.form_submit_button("Add Player")
@@ -46,13 +97,18 @@ def app():
 
             else:
                 try:
-                    response = supabase.table("players").insert({
-                        "name": name.strip(),
-                        "dupr": dupr.strip(),
-                        "skill": skill
-                    }).execute()
+                    response = data_access.write(
+                        lambda c: c.table("players").insert({
+                            "name": name.strip(),
+                            "dupr": dupr.strip(),
+                            "skill": skill,
+                            "club_id": club_id
+                        }),
+                        club_id=club_id
+                    )
 
                     if response.data:
+                        feed.publisher.insert(response.data[0])
                         st.sidebar.success(f"✅ {name} added!")
                         st.rerun()
                     else:
@@ -61,6 +117,72 @@ def app():
                 except Exception as e:
                     st.sidebar.error(f"Error adding player: {e}")
 
+    # =====================================================
+    # SIDEBAR - BULK IMPORT
+    # =====================================================
+    st.sidebar.header("📥 Bulk Import")
+
+    import_file = st.sidebar.file_uploader(
+        "Players file (Name, DUPR_ID, optional Skill)",
+        type=["xlsx", "csv"]
+    )
+
+    if import_file is not None and st.sidebar.button("Import Players"):
+
+        df_import = read_roster_file(import_file)
+
+        missing = [c for c in ("Name", "DUPR_ID") if c not in df_import.columns]
+
+        if missing:
+            st.sidebar.error(f"Missing required column: {', '.join(missing)}")
+
+        else:
+            records, report = prepare_import(
+                df_import, {str(p.get("dupr")) for p in players}
+            )
+
+            # Upsert in chunks; a failed chunk marks only its own rows.
+            # Rows with and without a skill go in separate requests, since a
+            # bulk upsert fills columns missing from a row with defaults.
+            # on_conflict needs the unique (club_id, dupr) index from
+            # sql/001_clubs.sql.
+            by_dupr = {r["DUPR ID"]: r for r in report if r["Status"] in ("Added", "Updated")}
+
+            with_skill = [r for r in records if "skill" in r]
+            without_skill = [r for r in records if "skill" not in r]
+
+            chunks = [
+                group[start:start + IMPORT_BATCH]
+                for group in (with_skill, without_skill)
+                for start in range(0, len(group), IMPORT_BATCH)
+            ]
+
+            for chunk in chunks:
+
+                chunk = [{**rec, "club_id": club_id} for rec in chunk]
+
+                try:
+                    response = data_access.write(
+                        lambda c: c.table("players").upsert(chunk, on_conflict="club_id,dupr"),
+                        retries=data_access.RETRIES,
+                        club_id=club_id
+                    )
+
+                    for row in response.data or []:
+                        feed.publisher.insert(row)
+
+                except Exception as e:
+                    for rec in chunk:
+                        by_dupr[rec["dupr"]]["Status"] = f"Failed: {e}"
+
+            players = feed.rows()
+
+            imported = sum(r["Status"] in ("Added", "Updated") for r in report)
+            st.sidebar.success(f"Imported {imported} of {len(report)} rows")
+
+            st.subheader("📥 Import Report")
+            st.dataframe(pd.DataFrame(report), use_container_width=True, hide_index=True)
+
     # =====================================================
     # SIDEBAR - DELETE PLAYER
     # =====================================================
@@ -85,15 +207,14 @@ def app():
 
                 if selected_player:
 
-                    delete_response = (
-                        supabase
-                        .table("players")
-                        .delete()
-                        .eq("id", selected_player["id"])
-                        .execute()
+                    delete_response = data_access.write(
+                        lambda c: c.table("players").delete().eq("club_id", club_id).eq("id", selected_player["id"]),
+                        retries=data_access.RETRIES,
+                        club_id=club_id
                     )
 
                     if delete_response.data is not None:
+                        feed.publisher.delete({"id": selected_player["id"]})
                         st.sidebar.success(f"Deleted {selected_name}")
                         st.rerun()
                     else:
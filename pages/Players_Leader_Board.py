@@ -1,52 +1,65 @@
+import time
 import streamlit as st
 import pandas as pd
-from supabase_client import get_supabase
-
-supabase = get_supabase()
+from clubs import club_name, current_club
+from leaderboard_snapshots import current_board, get_snapshot_store, rank_movement
 
 def app():
     """Players Leader Board Page"""
 
-    st.title("🏆 TiraDinks Leaderboard")
+    st.title(f"🏆 {club_name(current_club())} Leaderboard")
     st.caption("Rankings based on total wins and win rate")
 
     # ================== GET PLAYER DATA ==================
-    def get_players_data():
-        """Fetch players from Supabase."""
+    def get_board():
+        """Latest materialized leaderboard snapshot."""
         try:
-            response = supabase.table("players").select("*").execute()
-            if response.data:
-                df = pd.DataFrame(response.data)
-                # Calculate win rate
-                df["win_rate"] = df.apply(
-                    lambda row: round((row["wins"] / row["games"]) * 100, 2) if row["games"] > 0 else 0,
-                    axis=1
-                )
-                return df
-            else:
-                return pd.DataFrame(columns=["name", "skill", "wins", "games", "win_rate"])
+            return current_board()
         except Exception as e:
             st.error(f"Failed to fetch players: {e}")
-            return pd.DataFrame(columns=["name", "skill", "wins", "games", "win_rate"])
+            return pd.DataFrame(columns=["name", "skill", "wins", "games", "win_rate", "rank"])
+
+    def movement(delta):
+        if pd.isna(delta):
+            return "🆕"
+        if delta > 0:
+            return f"▲ {int(delta)}"
+        if delta < 0:
+            return f"▼ {int(-delta)}"
+        return "–"
+
+    df_players = get_board().copy()     # the board is shared between sessions
+
+    # ================== COMPARE WITH ==================
+    store = get_snapshot_store()
+    history = store.history()
+
+    previous = None
+    if history:
+        taken = dict(history)
+        compare_id = st.selectbox(
+            "Rank movement since",
+            list(taken),
+            index=min(1, len(taken) - 1),     # the newest snapshot usually matches the board
+            format_func=lambda i: time.strftime("%b %d, %H:%M", time.localtime(taken[i]))
+        )
+        previous = store.load(compare_id)
 
-    df_players = get_players_data()
+    df_players["movement"] = rank_movement(df_players, previous).map(movement)
 
     # ================== LEADERBOARD BY CATEGORY ==================
     categories = ["BEGINNER", "NOVICE", "INTERMEDIATE"]
 
     for cat in categories:
         st.subheader(f"{cat.title()}s")
-        df_cat = df_players[df_players["skill"].str.upper() == cat].copy()
+        df_cat = df_players[df_players["skill"] == cat]
 
         if not df_cat.empty:
-            # Sort by wins descending, then by win_rate descending
-            df_cat.sort_values(["wins", "win_rate"], ascending=[False, False], inplace=True)
-            # Select only columns to display
-            df_display = df_cat[["name", "wins", "win_rate"]].copy()
-            df_display.rename(
-                columns={"name": "Player Name", "wins": "Wins", "win_rate": "Win Rate (%)"},
-                inplace=True
+            # Already ranked by wins, then win_rate
+            df_display = df_cat[["rank", "name", "wins", "win_rate", "movement"]].rename(
+                columns={"rank": "#", "name": "Player Name", "wins": "Wins",
+                         "win_rate": "Win Rate (%)", "movement": "Movement"}
             )
-            st.dataframe(df_display.reset_index(drop=True), use_container_width=True)
+            st.dataframe(df_display, use_container_width=True, hide_index=True)
         else:
             st.info("No players in this category yet.")
@@ -0,0 +1,231 @@
+"""Lightweight timing and query metrics.
+
+Disabled by default.  ``TIRADINKS_PERF=1`` turns it on for the whole
+process; the organizer debug toggle turns it on for that organizer's
+session only (kept in ``st.session_state`` and picked up by
+``begin_rerun``).  While disabled, ``timer()`` hands back a shared no-op
+context and Supabase clients are returned unwrapped, so the cost is one
+flag check.
+
+Every timer is aggregated process-wide (count / sum / max / rows) and also
+kept as a span on the current rerun so the debug sidebar can show where
+the last rerun spent its time.
+"""
+import json
+import os
+import threading
+import time
+
+import streamlit as st
+
+
+enabled = os.environ.get("TIRADINKS_PERF", "") not in ("", "0")
+
+_lock = threading.Lock()
+_metrics = {}                   # (name, labels) -> [count, sum, max, rows]
+_rerun = threading.local()      # Streamlit runs each rerun on its own thread
+
+
+class _NoopTimer:
+
+    rows = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NOOP = _NoopTimer()
+
+
+class _Timer:
+
+    __slots__ = ("name", "labels", "rows", "start")
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+        self.rows = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, time.perf_counter() - self.start, self.rows, **self.labels)
+        return False
+
+
+def active():
+    """On for the whole process, or for the session running this thread."""
+    return enabled or getattr(_rerun, "active", False)
+
+
+def timer(name, **labels):
+    """Context manager timing a block; set ``.rows`` on it to count rows."""
+    if not active():
+        return _NOOP
+    return _Timer(name, labels)
+
+
+def record(name, seconds, rows=0, **labels):
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        m = _metrics.setdefault(key, [0, 0.0, 0.0, 0])
+        m[0] += 1
+        m[1] += seconds
+        m[2] = max(m[2], seconds)
+        m[3] += rows
+    spans = getattr(_rerun, "spans", None)
+    if spans is not None:
+        spans.append((name, labels, seconds, rows))
+
+
+def begin_rerun():
+    _rerun.active = bool(st.session_state.get("perf_enabled"))
+    _rerun.spans = [] if active() else None
+
+
+def rerun_spans():
+    return list(getattr(_rerun, "spans", None) or [])
+
+
+def reset():
+    with _lock:
+        _metrics.clear()
+
+
+def snapshot():
+    with _lock:
+        return [
+            {"name": name, "labels": dict(labels), "count": m[0],
+             "sum": m[1], "max": m[2], "rows": m[3]}
+            for (name, labels), m in sorted(_metrics.items())
+        ]
+
+
+# ======================================================
+# EXPORT
+# ======================================================
+def _prom_escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _prom_labels(labels):
+    return ",".join(f'{k}="{_prom_escape(v)}"' for k, v in sorted(labels.items()))
+
+
+def to_prometheus():
+    lines = [
+        "# TYPE tiradinks_seconds summary",
+        "# TYPE tiradinks_seconds_max gauge",
+        "# TYPE tiradinks_rows_total counter",
+    ]
+    for m in snapshot():
+        labels = _prom_labels({"name": m["name"], **m["labels"]})
+        lines.append(f"tiradinks_seconds_count{{{labels}}} {m['count']}")
+        lines.append(f"tiradinks_seconds_sum{{{labels}}} {m['sum']:.6f}")
+        lines.append(f"tiradinks_seconds_max{{{labels}}} {m['max']:.6f}")
+        lines.append(f"tiradinks_rows_total{{{labels}}} {m['rows']}")
+    return "\n".join(lines) + "\n"
+
+
+def to_jsonl():
+    return "".join(json.dumps(m) + "\n" for m in snapshot())
+
+
+# ======================================================
+# SUPABASE QUERY TIMING
+# ======================================================
+_QUERY_OPS = {"select", "insert", "update", "upsert", "delete"}
+
+
+class _Query:
+    """Wraps a query builder so ``execute()`` is timed with its row count."""
+
+    def __init__(self, builder, table, op=None):
+        self._builder = builder
+        self._table = table
+        self._op = op
+
+    def execute(self):
+        with timer("supabase_query", table=self._table, op=self._op or "query") as t:
+            response = self._builder.execute()
+            t.rows = len(response.data or []) if isinstance(response.data, list) else 0
+        return response
+
+    def __getattr__(self, name):
+        attr = getattr(self._builder, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            op = name if name in _QUERY_OPS and self._op is None else self._op
+            return _Query(attr(*args, **kwargs), self._table, op)
+
+        return call
+
+
+class InstrumentedClient:
+
+    def __init__(self, client):
+        self._client = client
+
+    def table(self, name):
+        return _Query(self._client.table(name), name)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+# ======================================================
+# ORGANIZER DEBUG SIDEBAR
+# ======================================================
+def render_sidebar():
+
+    with st.sidebar.expander("🛠 Performance"):
+
+        if enabled:
+            st.caption("Collecting for every session (TIRADINKS_PERF)")
+        elif not st.toggle("Collect metrics", key="perf_enabled"):
+            return
+
+        spans = rerun_spans()
+
+        if spans:
+            st.caption(f"Last rerun ({len(spans)} spans)")
+            st.dataframe(
+                [
+                    {"Timer": name, "Labels": _prom_labels(labels), "ms": round(sec * 1000, 2), "Rows": rows}
+                    for name, labels, sec, rows in spans
+                ],
+                hide_index=True,
+                use_container_width=True
+            )
+
+        totals = snapshot()
+
+        if totals:
+            st.caption("Since start")
+            st.dataframe(
+                [
+                    {"Timer": m["name"], "Labels": _prom_labels(m["labels"]), "Count": m["count"],
+                     "Avg ms": round(m["sum"] / m["count"] * 1000, 2),
+                     "Max ms": round(m["max"] * 1000, 2), "Rows": m["rows"]}
+                    for m in totals
+                ],
+                hide_index=True,
+                use_container_width=True
+            )
+
+            c1, c2 = st.columns(2)
+            c1.download_button("Prometheus", to_prometheus(), "metrics.prom", "text/plain")
+            c2.download_button("JSON lines", to_jsonl(), "metrics.jsonl", "application/json")
+
+            if st.button("Reset metrics"):
+                reset()
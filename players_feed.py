@@ -0,0 +1,252 @@
+"""Change feed over the Supabase ``players`` table.
+
+One in-process roster is seeded with a single full select and then kept
+fresh by insert / update / delete events.  Events come from Supabase
+realtime when it is available, and from :class:`LocalPublisher` otherwise
+(offline use, tests).  While realtime is not subscribed, the roster is
+reseeded from Supabase every ``POLL_INTERVAL`` seconds instead.  Pages
+also publish their own writes so the session that made a change sees it
+immediately.
+
+Readers never scan the table again: they read ``rows()`` / ``get()`` or a
+``derived()`` value (leaderboard frames, indexes) that is rebuilt at most
+once per change.  The roster is seeded from the local SQLite mirror first
+(see ``local_mirror``) and refreshed from Supabase in the background.
+
+There is one feed per club, holding only that club's rows.
+"""
+import asyncio
+import threading
+
+import streamlit as st
+
+import data_access
+from clubs import DEFAULT_CLUB, club_caches, current_club
+from local_mirror import get_mirror
+
+
+INSERT, UPDATE, DELETE = "INSERT", "UPDATE", "DELETE"
+POLL_INTERVAL = 60      # seconds between full refreshes while realtime is off
+
+
+class PlayersFeed:
+
+    def __init__(self, club_id=DEFAULT_CLUB):
+        self.club_id = club_id
+        self.closed = threading.Event()
+        self._lock = threading.RLock()
+        self._rows = {}        # id -> row
+        self._by_name = {}     # name -> id
+        self._derived = {}     # key -> (version, value)
+        self._listeners = []
+        self.version = 0
+        self.realtime = False
+        self.publisher = LocalPublisher(self)
+
+    # ======================================================
+    # WRITE SIDE
+    # ======================================================
+    def seed(self, rows):
+        with self._lock:
+            self._rows = {r["id"]: dict(r) for r in rows}
+            self._by_name = {r["name"]: r["id"] for r in rows}
+            self.version += 1
+
+    def apply(self, event, record, old_record=None):
+        """Apply one change event; repeats of the same event are harmless."""
+        with self._lock:
+            key = self._key(record) or self._key(old_record or {})
+
+            if event == DELETE:
+                row = self._rows.pop(key, None)
+                if row:
+                    self._by_name.pop(row["name"], None)
+
+            elif key is not None or event == INSERT:
+                row = {**self._rows.get(key, {}), **record}
+                key = row.get("id", key)
+                if key is None:
+                    return
+                old = self._rows.get(key)
+                if old and old["name"] != row.get("name"):
+                    self._by_name.pop(old["name"], None)
+                self._rows[key] = row
+                self._by_name[row["name"]] = key
+
+            else:
+                return
+
+            self.version += 1
+            listeners = list(self._listeners)
+
+        for callback in listeners:
+            callback(event, record)
+
+    def subscribe(self, callback):
+        with self._lock:
+            self._listeners.append(callback)
+
+    def _key(self, record):
+        if "id" in record:
+            return record["id"]
+        return self._by_name.get(record.get("name"))
+
+    # ======================================================
+    # READ SIDE
+    # ======================================================
+    def rows(self):
+        """Roster ordered like ``select("*").order("created_at")``."""
+        with self._lock:
+            rows = [dict(r) for r in self._rows.values()]
+        return sorted(rows, key=lambda r: str(r.get("created_at") or ""))
+
+    def get(self, name):
+        with self._lock:
+            key = self._by_name.get(name)
+            return dict(self._rows[key]) if key in self._rows else None
+
+    def derived(self, key, build):
+        """Memoize ``build(rows)`` until the next change event."""
+        with self._lock:
+            version = self.version
+            cached = self._derived.get(key)
+        if cached and cached[0] == version:
+            return cached[1]
+        value = build(self.rows())
+        with self._lock:
+            self._derived[key] = (version, value)
+        return value
+
+    def close(self):
+        """Evicted from the club caches: stop listening for changes."""
+        self.closed.set()
+
+
+class LocalPublisher:
+    """Stand-in for Supabase realtime: pushes events straight into a feed."""
+
+    def __init__(self, feed):
+        self.feed = feed
+
+    def insert(self, record):
+        self.feed.apply(INSERT, record)
+
+    def update(self, record):
+        self.feed.apply(UPDATE, record)
+
+    def delete(self, record):
+        self.feed.apply(DELETE, record, record)
+
+
+# ======================================================
+# SUPABASE REALTIME
+# ======================================================
+def _parse_payload(payload):
+    """Normalize the realtime payload shapes used across client versions."""
+    data = payload.get("data", payload)
+    event = data.get("type") or data.get("eventType")
+    record = data.get("record") or data.get("new") or {}
+    old_record = data.get("old_record") or data.get("old") or {}
+    return event, record, old_record
+
+
+def start_realtime(feed, timeout=5):
+    """Subscribe ``feed`` to its club's ``players`` changes; False if unavailable.
+
+    ``feed.realtime`` is True only while the channel is actually
+    SUBSCRIBED; an error, timeout or close turns it back off.
+    """
+    try:
+        from supabase import acreate_client
+        url, key = st.secrets["SUPABASE_URL"], st.secrets["SUPABASE_KEY"]
+    except Exception:
+        return False
+
+    ready = threading.Event()
+
+    def on_change(payload):
+        event, record, old_record = _parse_payload(payload)
+        if event and record.get("club_id", feed.club_id) == feed.club_id:
+            feed.apply(event, record, old_record)
+
+    def on_status(status, error=None):
+        feed.realtime = getattr(status, "value", status) == "SUBSCRIBED"
+        ready.set()
+
+    async def listen():
+        try:
+            client = await acreate_client(url, key)
+            channel = client.channel(f"players-feed-{feed.club_id}")
+            channel.on_postgres_changes(
+                "*", schema="public", table="players",
+                filter=f"club_id=eq.{feed.club_id}", callback=on_change
+            )
+            await channel.subscribe(on_status)
+        except Exception:
+            feed.realtime = False
+            ready.set()
+            return
+        while not feed.closed.is_set():
+            await asyncio.sleep(1)
+        await channel.unsubscribe()
+
+    threading.Thread(
+        target=lambda: asyncio.run(listen()), name=f"players-feed-{feed.club_id}", daemon=True
+    ).start()
+    ready.wait(timeout)
+
+    return feed.realtime
+
+
+def start_polling(feed, mirror, interval=POLL_INTERVAL):
+    """Reseed from Supabase every ``interval`` seconds while realtime is off."""
+    def loop():
+        while not feed.closed.wait(interval):
+            if feed.realtime:
+                continue
+            try:
+                refresh_from_server(feed, mirror)
+            except Exception:
+                pass
+
+    threading.Thread(target=loop, name=f"players-poll-{feed.club_id}", daemon=True).start()
+
+
+def refresh_from_server(feed, mirror):
+    """Reseed from Supabase, keeping local writes that have not synced yet."""
+    rows = [dict(r) for r in data_access.select("players", order="created_at", club_id=feed.club_id)]
+    mirror.replace_players(rows)
+    feed.seed(rows)
+    for _, tbl, op, name, values in mirror.pending():
+        if tbl != "players":
+            continue
+        if op == "increment":
+            row = feed.get(name) or {}
+            values = {col: (row.get(col) or 0) + values[col] for col in ("games", "wins")}
+        feed.apply(UPDATE, {"name": name, **values})
+
+
+def get_players_feed(club_id=None):
+    """The club's feed, seeded once and shared by every session of the club."""
+    club_id = club_id or current_club()
+    return club_caches().get(club_id, "players_feed", lambda: _build_feed(club_id))
+
+
+def _build_feed(club_id):
+    feed = PlayersFeed(club_id)
+    mirror = get_mirror(club_id)
+    cached = mirror.players()
+
+    if cached:
+        # Serve the on-disk roster now; catch up with the server behind it.
+        feed.seed(cached)
+        threading.Thread(
+            target=lambda: refresh_from_server(feed, mirror), name=f"players-refresh-{club_id}", daemon=True
+        ).start()
+    else:
+        refresh_from_server(feed, mirror)
+
+    feed.subscribe(mirror.apply_event)
+    start_realtime(feed)
+    start_polling(feed, mirror)
+    return feed
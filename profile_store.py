@@ -0,0 +1,145 @@
+"""SQLite-backed store for saved AutoStack profiles.
+
+Each profile is one row: an index part (name, updated time, player count,
+match count, size) that listing reads, and two payload sections - the
+binary ``StackState`` without history, and the compressed history, which
+is only read when something asks for it.  Profile names are row keys and
+never touch the file system.  Every club has its own store file.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from clubs import DEFAULT_CLUB, club_caches, club_path, current_club
+from stack_state import HistoryUnavailable, StackState
+
+
+class ProfileChanged(HistoryUnavailable):
+    """The saved profile was overwritten or deleted after it was loaded."""
+
+
+STORE_PATH = os.environ.get("TIRADINKS_PROFILES", "profiles.db")
+LEGACY_DIR = "profiles"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    name TEXT PRIMARY KEY,
+    updated_at REAL NOT NULL,
+    players INTEGER NOT NULL,
+    matches INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    state BLOB NOT NULL,
+    history BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS profiles_updated ON profiles (updated_at DESC);
+"""
+
+
+class ProfileStore:
+
+    def __init__(self, path=STORE_PATH):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+        self._index = None
+
+    def index(self):
+        """Profile summaries, newest first; cached until the next write."""
+        with self._lock:
+            if self._index is None:
+                rows = self._db.execute(
+                    "SELECT name, updated_at, players, matches, size "
+                    "FROM profiles ORDER BY updated_at DESC"
+                ).fetchall()
+                self._index = [
+                    {"name": n, "updated_at": u, "players": p, "matches": m, "size": z}
+                    for n, u, p, m, z in rows
+                ]
+            return self._index
+
+    def save(self, name, stack):
+        """Save ``stack``; its history is streamed from the spill file in chunks."""
+        state = stack.dumps(history=False)
+        size, chunks = stack.history.dump()
+        with self._lock, self._db:
+            self._db.execute("BEGIN")
+            cur = self._db.execute(
+                "INSERT OR REPLACE INTO profiles "
+                "(name, updated_at, players, matches, size, state, history) "
+                "VALUES (?, ?, ?, ?, ?, ?, zeroblob(?))",
+                (name, time.time(), len(stack.ids), len(stack.history),
+                 len(state) + size, state, size)
+            )
+            with self._db.blobopen("profiles", "history", cur.lastrowid) as blob:
+                for chunk in chunks:
+                    blob.write(chunk)
+            self._index = None
+
+    def load(self, name):
+        """The saved state; its history is read on first access.
+
+        The history read is pinned to the row version loaded here, so a
+        profile saved over or deleted in the meantime raises
+        ``ProfileChanged`` rather than handing back someone else's matches
+        (the stack then starts an empty history and warns).
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT rowid, updated_at, state, matches FROM profiles WHERE name = ?", (name,)
+            ).fetchone()
+        if row is None:
+            raise KeyError(name)
+        rowid, updated_at, state, matches = row
+        stack = StackState.loads(state)
+        stack.defer_history(lambda: self.load_history(name, rowid, updated_at), matches)
+        return stack
+
+    def load_history(self, name, rowid, updated_at):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT history FROM profiles WHERE rowid = ? AND name = ? AND updated_at = ?",
+                (rowid, name, updated_at)
+            ).fetchone()
+        if row is None:
+            raise ProfileChanged(
+                f"Profile '{name}' was saved over or deleted since it was loaded, so its "
+                "earlier match history is not available. New matches are still recorded."
+            )
+        return StackState.load_history(row[0])
+
+    def delete(self, name):
+        with self._lock:
+            self._db.execute("DELETE FROM profiles WHERE name = ?", (name,))
+            self._index = None
+
+    def import_legacy(self, directory=LEGACY_DIR):
+        """Copy old ``profiles/*.json`` files not yet in the store."""
+        if not os.path.isdir(directory):
+            return
+        known = {p["name"] for p in self.index()}
+        for f in sorted(os.listdir(directory)):
+            name, ext = os.path.splitext(f)
+            if name in known or ext != ".json":
+                continue
+            try:
+                with open(os.path.join(directory, f)) as fh:
+                    stack = StackState.from_legacy(json.load(fh))
+            except (OSError, ValueError, KeyError):
+                continue
+            self.save(name, stack)
+            known.add(name)
+
+
+def get_profile_store(club_id=None):
+    club_id = club_id or current_club()
+
+    def build():
+        store = ProfileStore(club_path(STORE_PATH, club_id))
+        if club_id == DEFAULT_CLUB:
+            store.import_legacy()     # pre-tenancy profiles belong to the original club
+        return store
+
+    return club_caches().get(club_id, "profiles", build)
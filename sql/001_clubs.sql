@@ -0,0 +1,53 @@
+-- Multi-club tenancy: a clubs table and club_id on players.
+-- Existing rows belong to the default club, 'tiradinks'.
+
+create table if not exists clubs (
+    id text primary key,            -- club slug, used as club_id everywhere
+    name text not null,
+    contact text default '',
+    created_at timestamptz not null default now()
+);
+
+insert into clubs (id, name) values ('tiradinks', 'TiraDinks')
+on conflict (id) do nothing;
+
+alter table players add column if not exists club_id text not null default 'tiradinks'
+    references clubs (id);
+
+create index if not exists players_club_created on players (club_id, created_at);
+create index if not exists players_club_name on players (club_id, name);
+
+-- Bulk import upserts on (club_id, dupr).
+alter table players drop constraint if exists players_dupr_key;
+create unique index if not exists players_club_dupr on players (club_id, dupr);
+
+-- Club accounts; passwords are salted PBKDF2-SHA256 ("salt$hexdigest").
+create table if not exists club_members (
+    id bigint generated always as identity primary key,
+    club_id text not null references clubs (id) on delete cascade,
+    username text not null unique,
+    role text not null check (role in ('organizer', 'member')),
+    password_hash text not null,
+    created_at timestamptz not null default now()
+);
+
+create index if not exists club_members_club on club_members (club_id);
+
+-- Club sign-up: the club and its first organizer in one transaction.
+create or replace function register_club(
+    p_club_id text,
+    p_name text,
+    p_contact text,
+    p_username text,
+    p_password_hash text
+) returns void
+language plpgsql
+as $$
+begin
+    insert into clubs (id, name, contact)
+    values (p_club_id, p_name, p_contact);
+
+    insert into club_members (club_id, username, role, password_hash)
+    values (p_club_id, p_username, 'organizer', p_password_hash);
+end;
+$$;
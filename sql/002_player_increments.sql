@@ -0,0 +1,32 @@
+-- Idempotent, atomic match-result increments pushed by the local mirror.
+-- Each queued increment carries an op_id; one that was already applied
+-- (a retry after a timed-out call that actually landed) is ignored.
+
+create table if not exists applied_ops (
+    op_id text primary key,
+    applied_at timestamptz not null default now()
+);
+
+create or replace function increment_player(
+    p_club_id text,
+    p_name text,
+    p_games integer,
+    p_wins integer,
+    p_op_id text
+) returns void
+language plpgsql
+as $$
+begin
+    insert into applied_ops (op_id) values (p_op_id)
+    on conflict (op_id) do nothing;
+
+    if not found then
+        return;
+    end if;
+
+    update players
+    set games = coalesce(games, 0) + p_games,
+        wins = coalesce(wins, 0) + p_wins
+    where club_id = p_club_id and name = p_name;
+end;
+$$;
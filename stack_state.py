@@ -0,0 +1,382 @@
+"""Compact AutoStack session model.
+
+Players are ``__slots__`` records addressed by small integer ids, skills
+are integer codes, and courts are flat ``array`` slots (four player ids per
+court, ``EMPTY`` when free).  ``dumps`` / ``loads`` give a versioned binary
+form used for saved profiles; ``from_legacy`` reads the old JSON profiles.
+Match history is a bounded ``MatchHistory`` that spills old matches to
+disk.  It can be stored apart from the rest (``dumps(history=False)`` plus
+``dump_history``) and attached lazily with ``defer_history``.
+"""
+import numbers
+import struct
+from array import array
+from collections import deque
+
+from match_history import MatchHistory
+
+
+SKILLS = ("BEGINNER", "NOVICE", "INTERMEDIATE")
+SKILL_CODE = {s: i for i, s in enumerate(SKILLS)}
+BEGINNER, NOVICE, INTERMEDIATE = range(3)
+
+EMPTY = -1
+SLOTS_PER_COURT = 4
+
+MAGIC = b"TDSS"
+VERSION = 2
+
+_HEADER = struct.Struct("<4sBBHIII")       # magic, version, started, courts, ids, queue, history bytes
+_PLAYER = struct.Struct("<IBIIIHBH")       # pid, skill, games, wins, losses, name len, dupr kind, dupr len
+
+DUPR_NONE, DUPR_TEXT, DUPR_INT, DUPR_FLOAT = range(4)
+
+
+class HistoryUnavailable(LookupError):
+    """A deferred history can no longer be read (its source changed)."""
+
+
+class Player:
+
+    __slots__ = ("pid", "name", "skill", "dupr", "games", "wins", "losses")
+
+    def __init__(self, pid, name, skill, dupr, games=0, wins=0, losses=0):
+        self.pid = pid
+        self.name = name
+        self.skill = skill
+        self.dupr = dupr
+        self.games = games
+        self.wins = wins
+        self.losses = losses
+
+    @property
+    def skill_name(self):
+        return SKILLS[self.skill]
+
+
+def skill_code(skill):
+    return SKILL_CODE[str(skill).upper()]
+
+
+def _encode_dupr(dupr):
+    if dupr is None:
+        return DUPR_NONE, b""
+    if isinstance(dupr, numbers.Integral) and not isinstance(dupr, bool):
+        return DUPR_INT, str(int(dupr)).encode("ascii")
+    if isinstance(dupr, numbers.Real) and not isinstance(dupr, bool):
+        return DUPR_FLOAT, repr(float(dupr)).encode("ascii")
+    return DUPR_TEXT, str(dupr).encode("utf-8")
+
+
+def _decode_dupr(kind, raw):
+    if kind == DUPR_NONE:
+        return None
+    if kind == DUPR_INT:
+        return int(raw)
+    if kind == DUPR_FLOAT:
+        return float(raw)
+    return raw.decode("utf-8")
+
+
+def safe_group(players):
+    """Beginners and intermediates never share a court."""
+    skills = {p.skill for p in players}
+    return not (BEGINNER in skills and INTERMEDIATE in skills)
+
+
+class StackState:
+
+    def __init__(self, court_count=2):
+        self.players = []           # pid -> Player (None once removed)
+        self.ids = {}               # name -> pid
+        self.queue = deque()        # pids
+        self._history = MatchHistory()
+        self._history_loader = None
+        self._history_count = 0
+        self.history_warning = None
+        self.started = False
+        self.court_count = court_count
+        self.slots = array("i")
+        self.free = set()           # court ids with no match on them
+        self.locked = bytearray()
+        self.scores = array("i")
+
+    # ======================================================
+    # HISTORY
+    # ======================================================
+    @property
+    def history(self):
+        """Match history; a deferred one is loaded here on first access.
+
+        If the loader raises ``HistoryUnavailable`` the session carries on
+        with an empty history and the reason is left in
+        ``history_warning`` for the page to show.
+        """
+        if self._history_loader is not None:
+            try:
+                loaded = self._history_loader()
+            except HistoryUnavailable as e:
+                loaded = []
+                self.history_warning = str(e)
+            self.history = loaded
+        return self._history
+
+    @history.setter
+    def history(self, value):
+        self._history = value if isinstance(value, MatchHistory) else MatchHistory(value)
+        self._history_loader = None
+
+    def defer_history(self, loader, count):
+        """Load history with ``loader()`` the first time it is read."""
+        self._history_loader = loader
+        self._history_count = count
+
+    def has_history(self):
+        if self._history_loader is not None:
+            return self._history_count > 0
+        return bool(self._history)
+
+    def dump_history(self):
+        return self.history.to_bytes()
+
+    def close(self):
+        """Release the history spill file."""
+        self._history.close()
+
+    @staticmethod
+    def load_history(data):
+        return MatchHistory.from_bytes(data)
+
+    # ======================================================
+    # PLAYERS
+    # ======================================================
+    def add_player(self, name, skill, dupr):
+        """Register ``name`` and put them at the front of the queue."""
+        if name in self.ids:
+            return None
+        player = Player(len(self.players), name, skill_code(skill), dupr)
+        self.players.append(player)
+        self.ids[name] = player.pid
+        self.queue.appendleft(player.pid)
+        return player
+
+    def player(self, name):
+        pid = self.ids.get(name)
+        return None if pid is None else self.players[pid]
+
+    def active_players(self):
+        return [p for p in self.players if p is not None]
+
+    def remove_player(self, name):
+        pid = self.ids.pop(name, None)
+        if pid is None:
+            return
+
+        self.queue = deque(q for q in self.queue if q != pid)
+
+        for cid in self.court_ids():
+            pids = self.court_pids(cid)
+            if pid in pids:
+                # A court left with three players cannot continue.
+                self.queue.extend(q for q in pids if q != pid)
+                self.clear_court(cid)
+
+        self.players[pid] = None
+
+    # ======================================================
+    # COURTS
+    # ======================================================
+    def start(self, court_count):
+        self.started = True
+        self.court_count = court_count
+        self.slots = array("i", [EMPTY] * (court_count * SLOTS_PER_COURT))
+        self.free = set(range(1, court_count + 1))
+        self.locked = bytearray(court_count)
+        self.scores = array("i", [0] * (court_count * 2))
+
+    def court_ids(self):
+        return range(1, len(self.locked) + 1)
+
+    def court_pids(self, cid):
+        i = (cid - 1) * SLOTS_PER_COURT
+        pids = self.slots[i:i + SLOTS_PER_COURT]
+        return [] if pids[0] == EMPTY else list(pids)
+
+    def teams(self, cid):
+        """``[team_a, team_b]`` as Player lists, or None for a free court."""
+        pids = self.court_pids(cid)
+        if not pids:
+            return None
+        return [
+            [self.players[q] for q in pids[:2]],
+            [self.players[q] for q in pids[2:]],
+        ]
+
+    def set_court(self, cid, pids):
+        i = (cid - 1) * SLOTS_PER_COURT
+        self.slots[i:i + SLOTS_PER_COURT] = array("i", pids)
+        if pids[0] == EMPTY:
+            self.free.add(cid)
+        else:
+            self.free.discard(cid)
+
+    def _index_free(self):
+        self.free = {cid for cid in self.court_ids() if not self.court_pids(cid)}
+
+    def take_four_safe(self):
+        """Pop the first safe four from the queue, in queue order.
+
+        A safe group is four players with no beginners or four with no
+        intermediates, so the earliest one is the first four of either
+        kind - whichever comes first in the queue.  O(len(queue)).
+        """
+        no_intermediate, no_beginner = [], []
+
+        for i, pid in enumerate(self.queue):
+            skill = self.players[pid].skill
+            if skill != INTERMEDIATE and len(no_intermediate) < 4:
+                no_intermediate.append(i)
+            if skill != BEGINNER and len(no_beginner) < 4:
+                no_beginner.append(i)
+            if len(no_intermediate) == 4 and len(no_beginner) == 4:
+                break
+
+        candidates = [c for c in (no_intermediate, no_beginner) if len(c) == 4]
+
+        if not candidates:
+            return None
+
+        chosen = set(min(candidates))
+        q = list(self.queue)
+        group = [q[i] for i in sorted(chosen)]
+        self.queue = deque(pid for i, pid in enumerate(q) if i not in chosen)
+
+        return group
+
+    def clear_court(self, cid):
+        self.set_court(cid, [EMPTY] * SLOTS_PER_COURT)
+        self.locked[cid - 1] = 0
+        self.set_score(cid, 0, 0)
+
+    def score(self, cid):
+        return self.scores[(cid - 1) * 2], self.scores[(cid - 1) * 2 + 1]
+
+    def set_score(self, cid, a, b):
+        self.scores[(cid - 1) * 2] = a
+        self.scores[(cid - 1) * 2 + 1] = b
+
+    # ======================================================
+    # SERIALIZATION
+    # ======================================================
+    def dumps(self, history=True):
+        players = self.active_players()
+        history = self.dump_history() if history else b""
+
+        parts = [_HEADER.pack(
+            MAGIC, VERSION, self.started, self.court_count,
+            len(self.players), len(self.queue), len(history)
+        ), struct.pack("<I", len(players))]
+
+        for p in players:
+            name = p.name.encode("utf-8")
+            kind, dupr = _encode_dupr(p.dupr)
+            parts.append(_PLAYER.pack(
+                p.pid, p.skill, p.games, p.wins, p.losses, len(name), kind, len(dupr)
+            ))
+            parts.append(name)
+            parts.append(dupr)
+
+        courts = len(self.locked)
+        parts.append(struct.pack("<H", courts))
+        parts.append(struct.pack(f"<{len(self.queue)}i", *self.queue))
+        parts.append(struct.pack(f"<{courts * SLOTS_PER_COURT}i", *self.slots))
+        parts.append(bytes(self.locked))
+        parts.append(struct.pack(f"<{courts * 2}i", *self.scores))
+        parts.append(history)
+
+        return b"".join(parts)
+
+    @classmethod
+    def loads(cls, data):
+        view = memoryview(data)
+        magic, version, started, court_count, n_ids, n_queue, n_history = _HEADER.unpack_from(view)
+
+        if magic != MAGIC:
+            raise ValueError("Not an AutoStack profile")
+        if version != VERSION:
+            raise ValueError(f"Unsupported profile version {version}")
+
+        state = cls(court_count)
+        state.started = bool(started)
+        state.players = [None] * n_ids
+
+        pos = _HEADER.size
+        (n_players,) = struct.unpack_from("<I", view, pos)
+        pos += 4
+
+        for _ in range(n_players):
+            pid, skill, games, wins, losses, n_name, kind, n_dupr = _PLAYER.unpack_from(view, pos)
+            pos += _PLAYER.size
+            name = bytes(view[pos:pos + n_name]).decode("utf-8")
+            pos += n_name
+            dupr = _decode_dupr(kind, bytes(view[pos:pos + n_dupr]))
+            pos += n_dupr
+            state.players[pid] = Player(pid, name, skill, dupr, games, wins, losses)
+            state.ids[name] = pid
+
+        (courts,) = struct.unpack_from("<H", view, pos)
+        pos += 2
+
+        state.queue = deque(struct.unpack_from(f"<{n_queue}i", view, pos))
+        pos += n_queue * 4
+
+        state.slots = array("i", struct.unpack_from(f"<{courts * SLOTS_PER_COURT}i", view, pos))
+        pos += courts * SLOTS_PER_COURT * 4
+
+        state.locked = bytearray(view[pos:pos + courts])
+        pos += courts
+
+        state.scores = array("i", struct.unpack_from(f"<{courts * 2}i", view, pos))
+        pos += courts * 2 * 4
+
+        state._index_free()
+
+        if n_history:
+            state.history = cls.load_history(view[pos:pos + n_history])
+
+        return state
+
+    @classmethod
+    def from_legacy(cls, data):
+        """Build a state from an old JSON profile (tuples and string keys)."""
+        state = cls(data["court_count"])
+        state.history = data["history"]
+
+        skills = {}
+        for name, skill, dupr in data["queue"]:
+            skills[name] = skill
+        for teams in data["courts"].values():
+            for name, skill, dupr in (teams[0] + teams[1] if teams else []):
+                skills[name] = skill
+
+        for name, stats in data["players"].items():
+            player = state.add_player(name, skills.get(name, "NOVICE"), stats["dupr"])
+            player.games = stats["games"]
+            player.wins = stats["wins"]
+            player.losses = stats["losses"]
+
+        state.queue = deque(state.ids[p[0]] for p in data["queue"])
+
+        if data["courts"]:
+            state.start(len(data["courts"]))
+            for cid, teams in data["courts"].items():
+                cid = int(cid)
+                if teams:
+                    state.set_court(cid, [state.ids[p[0]] for p in teams[0] + teams[1]])
+                state.locked[cid - 1] = bool(data["locked"].get(str(cid)))
+                state.set_score(cid, *data["scores"].get(str(cid), [0, 0]))
+
+        state.started = data["started"]
+        state.court_count = data["court_count"]
+
+        return state
@@ -1,34 +1,22 @@
 import streamlit as st
 import importlib
+import perf
+import assets
+from clubs import DEFAULT_CLUB, authenticate, club_name
 
 st.set_page_config(page_title="Pickleball Manager", layout="centered")
 
 # =========================
 # BACKGROUND IMAGE
 # =========================
-page_bg_img = """
-<style>
-[data-testid="stAppViewContainer"] {
-background-image: url("TDphoto.jpg");
-background-size: cover;
-background-position: center;
-background-repeat: no-repeat;
-background-attachment: fixed;
-}
-
-[data-testid="stSidebarNav"] {
-display: none;
-}
-</style>
-"""
-st.markdown(page_bg_img, unsafe_allow_html=True)
+assets.inject_css()
 
 # =========================
 # USERS (HARDCODED)
 # =========================
 users = {
-    "tdorg1": {"password": "123456", "role": "organizer"},
-    "tdmem2": {"password": "123456", "role": "member"}
+    "tdorg1": {"password": "123456", "role": "organizer", "club": DEFAULT_CLUB},
+    "tdmem2": {"password": "123456", "role": "member", "club": DEFAULT_CLUB}
 }
 
 # =========================
@@ -38,6 +26,7 @@ if "logged_in" not in st.session_state:
     st.session_state.logged_in = False
     st.session_state.role = None
     st.session_state.user = None
+    st.session_state.club_id = None
 
 # =========================
 # LOGIN FUNCTION
@@ -45,7 +34,7 @@ if "logged_in" not in st.session_state:
 def login():
     col1, col2, col3 = st.columns([1,2,1])
     with col2:
-        st.image("TDphoto.jpg", width=300)
+        assets.logo(width=300)
 
     st.title("🏠 TiraDinks Official")
     st.write("Welcome to the TiraDinks Club!")
@@ -55,14 +44,26 @@ def login():
 
     if st.button("Sign In"):
         if username in users and users[username]["password"] == password:
+            account = (users[username]["role"], users[username]["club"])
+        else:
+            try:
+                account = authenticate(username, password)
+            except Exception:
+                account = None
+
+        if account:
             st.session_state.logged_in = True
             st.session_state.user = username
-            st.session_state.role = users[username]["role"]
+            st.session_state.role, st.session_state.club_id = account
             st.success("Login successful!")
             st.rerun()
         else:
             st.error("Invalid username or password")
 
+    if st.button("🏢 Register a Club"):
+        st.session_state.page = "register_club"
+        st.rerun()
+
 # =========================
 # LOGOUT FUNCTION
 # =========================
@@ -70,14 +71,18 @@ def logout():
     st.session_state.logged_in = False
     st.session_state.role = None
     st.session_state.user = None
+    st.session_state.club_id = None
     st.rerun()
 
 # =========================
 # MAIN APPLICATION
 # =========================
 def main_app():
+    perf.begin_rerun()
+
     st.sidebar.title("🏓 TiraDinks Menu")
     st.sidebar.write(f"Logged in as **{st.session_state.user}**")
+    st.sidebar.caption(f"Club: {club_name(st.session_state.club_id)}")
     st.sidebar.button("Logout", on_click=logout)
 
     # =========================
@@ -106,16 +111,29 @@ def main_app():
     try:
         page_module = importlib.import_module(pages[page_choice])
         if hasattr(page_module, "app"):
-            page_module.app()  # call the app() function inside the page file
+            with perf.timer("page_app", page=page_choice):
+                page_module.app()  # call the app() function inside the page file
         else:
             st.error(f"{page_choice}.py does not have an `app()` function.")
     except ModuleNotFoundError:
         st.error(f"Module for {page_choice} not found. Check file names in pages/ folder.")
 
+    # =========================
+    # DEBUG PANEL (ORGANIZERS)
+    # =========================
+    if st.session_state.role == "organizer":
+        perf.render_sidebar()
+
 # =========================
 # PAGE ROUTING
 # =========================
-if not st.session_state.logged_in:
-    login()
+if "join" in st.query_params:
+    # Players checking in from the organizer's link need no account
+    importlib.import_module("PlayerJoin").app()
+elif not st.session_state.logged_in:
+    if st.session_state.get("page") == "register_club":
+        importlib.import_module("RegisterClub").app()
+    else:
+        login()
 else:
     main_app()
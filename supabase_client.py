@@ -1,8 +1,6 @@
-from supabase import create_client
-import streamlit as st
+import perf
 
-def get_supabase():
-    return create_client(
-        st.secrets["SUPABASE_URL"],
-        st.secrets["SUPABASE_KEY"]
-    )
+def instrument(client):
+    if perf.active():
+        return perf.InstrumentedClient(client)
+    return client
@@ -0,0 +1,28 @@
+from leaderboard_snapshots import SnapshotStore, materialize, rank_movement
+
+
+def players():
+    return [
+        {"id": 1, "name": "Al", "skill": "Novice", "wins": 5, "games": 9},
+        {"id": 2, "name": "Al", "skill": "Novice", "wins": 3, "games": 9},
+        {"id": 3, "name": "Bo", "skill": "Novice", "wins": 4, "games": 9},
+        {"id": 4, "name": "Cy", "skill": "Beginner", "wins": 1, "games": 2},
+    ]
+
+
+def test_movement_with_duplicate_names(tmp_path):
+    rows = players()
+    store = SnapshotStore(str(tmp_path / "leaderboard.db"))
+    previous = store.load(store.save(materialize(rows)))
+
+    rows[1]["wins"] = 9
+    rows.append({"id": 5, "name": "Al", "skill": "Novice", "wins": 0, "games": 1})
+    board = materialize(rows)
+
+    moved = dict(zip(board["id"], rank_movement(board, previous)))
+
+    assert moved[2] == 2        # 3rd -> 1st
+    assert moved[1] == -1
+    assert moved[3] == -1
+    assert moved[4] == 0
+    assert moved[5] != moved[5]     # new entry: NaN
@@ -0,0 +1,80 @@
+from local_mirror import LocalMirror
+from loadtest.fake_supabase import FakeSupabase
+
+
+def setup(tmp_path):
+    fake = FakeSupabase()
+    fake.seed_players(2)
+    player = fake.tables["players"][0]
+    player["games"], player["wins"] = 10, 4
+    return fake, player, LocalMirror(str(tmp_path / "mirror.db"))
+
+
+def test_increments_add_to_server_totals(tmp_path):
+    fake, player, mirror = setup(tmp_path)
+
+    mirror.enqueue_increment(player["name"], games=1, wins=1)
+    mirror.enqueue_increment(player["name"], games=1, wins=0)
+
+    assert mirror.sync_once(fake) == 2
+    assert (player["games"], player["wins"]) == (12, 5)
+    assert mirror.pending() == []
+
+
+def test_increment_queued_during_sync_is_kept(tmp_path):
+    fake, player, mirror = setup(tmp_path)
+    mirror.enqueue_increment(player["name"], games=1, wins=1)
+
+    rpc = fake._rpc
+
+    def rpc_then_finish_another_game(name, params):
+        result = rpc(name, params)
+        fake._rpc = rpc
+        mirror.enqueue_increment(player["name"], games=1, wins=0)
+        return result
+
+    fake._rpc = rpc_then_finish_another_game
+
+    assert mirror.sync_once(fake) == 1
+    assert (player["games"], player["wins"]) == (11, 5)
+    assert len(mirror.pending()) == 1
+
+    mirror.sync_once(fake)
+    assert (player["games"], player["wins"]) == (12, 5)
+    assert mirror.pending() == []
+
+
+def test_retry_after_lost_response_counts_once(tmp_path):
+    fake, player, mirror = setup(tmp_path)
+    mirror.enqueue_increment(player["name"], games=1, wins=1)
+
+    rpc = fake._rpc
+
+    def applied_but_timed_out(name, params):
+        rpc(name, params)
+        raise TimeoutError
+
+    fake._rpc = applied_but_timed_out
+    try:
+        mirror.sync_once(fake)
+    except TimeoutError:
+        pass
+    assert len(mirror.pending()) == 1
+
+    fake._rpc = rpc
+    mirror.sync_once(fake)
+
+    assert (player["games"], player["wins"]) == (11, 5)
+    assert mirror.pending() == []
+
+
+def test_offline_organizers_add_up(tmp_path):
+    fake, player, first = setup(tmp_path)
+    second = LocalMirror(str(tmp_path / "other.db"))
+
+    first.enqueue_increment(player["name"], games=1, wins=1)
+    second.enqueue_increment(player["name"], games=1, wins=0)
+    first.sync_once(fake)
+    second.sync_once(fake)
+
+    assert (player["games"], player["wins"]) == (12, 5)
@@ -0,0 +1,98 @@
+from match_history import MatchHistory
+from stack_state import StackState
+
+
+def sample():
+    state = StackState()
+    state.add_player("Ana", "BEGINNER", 4.5)
+    state.add_player("Ben", "NOVICE", None)
+    state.add_player("Cy", "NOVICE", 12345)
+    state.add_player("Di", "INTERMEDIATE", "DX-77")
+    state.add_player("Ed", "NOVICE", 3.25)
+    state.start(2)
+    state.set_court(1, state.take_four_safe())
+    state.locked[0] = 1
+    state.set_score(1, 11, 7)
+    state.player("Ana").games = 3
+    state.player("Ana").wins = 2
+    state.player("Ana").losses = 1
+    state.history = [{"Court": 1, "Winner": "Team A"}]
+    return state
+
+
+def snapshot(state):
+    return {
+        "players": [
+            (p.pid, p.name, p.skill, p.dupr, type(p.dupr), p.games, p.wins, p.losses)
+            for p in state.active_players()
+        ],
+        "queue": list(state.queue),
+        "slots": list(state.slots),
+        "locked": bytes(state.locked),
+        "scores": list(state.scores),
+        "free": state.free,
+        "started": state.started,
+        "court_count": state.court_count,
+        "history": list(state.history),
+    }
+
+
+def test_binary_round_trip():
+    state = sample()
+    assert snapshot(StackState.loads(state.dumps())) == snapshot(state)
+
+
+def test_binary_round_trip_without_history():
+    state = sample()
+    loaded = StackState.loads(state.dumps(history=False))
+    assert list(loaded.history) == []
+    assert snapshot(loaded)["players"] == snapshot(state)["players"]
+
+
+def test_spilled_history_round_trip():
+    state = sample()
+    state.history = MatchHistory(({"Match": i} for i in range(11)), ring=4, block=2)
+    assert state.history.spilled
+
+    loaded = StackState.load_history(state.dump_history())
+
+    assert list(loaded) == [{"Match": i} for i in range(11)]
+    state.close()
+    loaded.close()
+    assert state.history.path is None and loaded.path is None
+
+
+def test_from_legacy():
+    legacy = {
+        "queue": [["Ed", "NOVICE", 3.25]],
+        "courts": {
+            "1": [[["Ana", "BEGINNER", 4.5], ["Ben", "NOVICE", None]],
+                  [["Cy", "NOVICE", 12345], ["Di", "NOVICE", "DX-77"]]],
+            "2": None,
+        },
+        "locked": {"1": True, "2": False},
+        "scores": {"1": [11, 7], "2": [0, 0]},
+        "history": [{"Court": 1, "Winner": "Team A"}],
+        "started": True,
+        "court_count": 2,
+        "players": {
+            "Ana": {"dupr": 4.5, "games": 3, "wins": 2, "losses": 1},
+            "Ben": {"dupr": None, "games": 0, "wins": 0, "losses": 0},
+            "Cy": {"dupr": 12345, "games": 0, "wins": 0, "losses": 0},
+            "Di": {"dupr": "DX-77", "games": 0, "wins": 0, "losses": 0},
+            "Ed": {"dupr": 3.25, "games": 0, "wins": 0, "losses": 0},
+        },
+    }
+
+    state = StackState.from_legacy(legacy)
+
+    assert [p.name for p in state.teams(1)[0] + state.teams(1)[1]] == ["Ana", "Ben", "Cy", "Di"]
+    assert state.free == {2}
+    assert state.score(1) == (11, 7)
+    assert bytes(state.locked) == b"\x01\x00"
+    assert [state.players[pid].name for pid in state.queue] == ["Ed"]
+    assert (state.player("Ana").games, state.player("Ana").wins, state.player("Ana").losses) == (3, 2, 1)
+    assert list(state.history) == legacy["history"]
+
+    # ...and it survives the binary format unchanged
+    assert snapshot(StackState.loads(state.dumps())) == snapshot(state)